@@ -5,7 +5,19 @@ import os
 from pyfiglet import Figlet
 from src.constants.const import *
 from src.graph.createGraph import create_graph
+from src.bench.bench import bench_batch, bench_keygen, bench_number, bench_sqp_many, bench_const, \
+    bench_select, bench_net, bench_pack, bench_dj, bench_fixed, bench_vec, bench_file
+from src.paillier import backend
 from src.paillier.paillier import *
+from src.paillier.dgk import dgk_key_gen
+from src.eqt.eqt import eqt
+from src.paillier.paillier_fixed import attach_table, detach_table
+from src.paillier.paillier_packing import Packing, enc_packed, dec_packed
+from src.paillier.paillier_pool import attach_pool, detach_pool
+from src.sqp.sqp_parallel import close_e_pools
+from src.sqp.sqp_stats import sqp_stats
+from src.paillier.paillier_store import save_keys, load_keys, load_store_key, store_path, save_bundles, \
+    take_bundle, bundle_path
 from src.functions.bcolors import bcolors
 
 
@@ -60,20 +72,119 @@ def save_time(file, data_list, length):
     output_f.close()
 
 
+def get_key_dir():
+    """
+    Gets the path to the key store, next to this file
+    :return: The path to the key store
+    """
+    return os.path.dirname(os.path.realpath(__file__)) + "/" + KEY_DIR
+
+
+def get_keys(key_file=None, save_key=None, key_len=KEY_LEN):
+    """
+    Gets the keys for a command. They are loaded from key_file if it is set, otherwise new keys are generated
+    :param key_file: Key file or key store folder to load the keys from
+    :param save_key: File where the keys are saved
+    :param key_len: Length of the keys generated or taken from the key store, in bits
+    :return: The public and private keys, None if they could not be loaded
+    """
+    try:
+        if key_file is None:  # Key generation
+            pk, sk = key_gen(key_len)
+        elif os.path.isdir(key_file):  # Take a key from the key store
+            pk, sk = load_store_key(key_len, key_file)
+        else:  # Single key file
+            pk, sk = load_keys(key_file)
+
+    except ValueError as err:  # Wrong or missing key
+        print(f"{bcolors.RED}Error: {err}{bcolors.END}")
+        return None, None
+
+    if sk is None:  # The commands need to decrypt
+        print(f"{bcolors.RED}Error: {key_file} has no private key{bcolors.END}")
+        return None, None
+
+    if save_key is not None:
+        save_keys(save_key, pk, sk)
+
+    return pk, sk
+
+
+def key_options(command):
+    """
+    Adds the options for loading and saving the keys to a command
+    :param command: Click command
+    :return: The command with the options added
+    """
+    command = click.option('--key-len', type=int, default=KEY_LEN,
+                           help='Length of the key generated, or taken from the key store, in bits')(command)
+    command = click.option('--save-key', type=click.Path(dir_okay=False),
+                           help='Save the keys used into this file')(command)
+    command = click.option('--key-file', type=click.Path(exists=True),
+                           help='Load the keys from this file, or from the key store if it is a folder')(command)
+    return command
+
+
+def add_suffix(file, suffix):
+    """
+    Adds a suffix to the name of a file, before its extension
+    :param file: Path of the file
+    :param suffix: Suffix to be added
+    :return: The new path
+    """
+    root, ext = os.path.splitext(file)
+    return root + suffix + ext
+
+
+def print_sqp_stats(msg_len):
+    """
+    Prints the average amount of e values calculated and decrypted per comparison
+    :param msg_len: Length of the compared messages, which is the total amount of e values
+    :return:
+    """
+    print(f"{bcolors.BLUE}e values per comparison: {sqp_stats.avg_e_computed():.1f} calculated, "
+          f"{sqp_stats.avg_e_decrypted():.1f} decrypted of {msg_len}{bcolors.END}")
+
+
+def print_pool_stats(pool):
+    """
+    Prints the hits and misses of an obfuscator pool
+    :param pool: Obfuscator pool
+    :return:
+    """
+    hits, misses = pool.stats()
+    total = hits + misses
+
+    hit_rate = 100 * hits / total if total > 0 else 0
+    print(f"{bcolors.BLUE}Obfuscator pool (capacity {pool.capacity}): {hits} hits, {misses} misses "
+          f"({hit_rate:.1f}% hit rate){bcolors.END}")
+
+
 @click.group()
-def main():
-    pass
+@click.option('--backend', 'backend_name', type=click.Choice(backend.BACKENDS), default=backend.AUTO,
+              help='Big integer arithmetic backend. auto uses gmpy2 when it is installed')
+def main(backend_name=backend.AUTO):
+    try:
+        active = backend.set_backend(backend_name)
+    except ValueError as err:  # gmpy2 selected but not installed
+        print(f"{bcolors.RED}Error: {err}{bcolors.END}")
+        raise click.Abort()
+
+    print(f"{bcolors.BLUE}Arithmetic backend: {active}{bcolors.END}")
 
 
 @main.command(help='Run execution tests to check that the correct value is obtained in the tests')
-def test_pail():
+@key_options
+def test_pail(key_file=None, save_key=None, key_len=KEY_LEN):
     f = Figlet(font='slant')  # Useless cool text
     print(f.renderText('Paillier Test'))
     print("Executing...")
 
     # Run the Paillier encryption as many times as it is defined in TEST_RANGE
     for i in range(0, TEST_RANGE):
-        pk, sk = key_gen()  # Create key
+        pk, sk = get_keys(key_file, save_key, key_len)  # Create key
+        if pk is None:
+            return
         msg_enc = enc(TEST_MSG, pk)  # Encrypt Test Message
         msg_dec = dec(msg_enc, sk, pk)  # Decrypt Test Message
 
@@ -82,13 +193,138 @@ def test_pail():
             print("{}Wrong decrypt: {}{}".format(bcolors.RED, msg_dec, bcolors.END))
             return  # Finish tests
 
+        # Slot wise operations of packed values
+        packing = Packing(pk, max(TIM_L))
+        val_1 = [random.randrange(2 ** max(TIM_L)) for _ in range(packing.slots + 1)]
+        val_2 = [random.randrange(2 ** max(TIM_L)) for _ in range(packing.slots + 1)]
+        packed = [p_1 * 3 + p_2 for p_1, p_2 in zip(enc_packed(val_1, packing), enc_packed(val_2, packing))]
+
+        if dec_packed(packed, sk) != [v_1 * 3 + v_2 for v_1, v_2 in zip(val_1, val_2)]:  # Error found - Wrong slots
+            print("{}Wrong packed values{}".format(bcolors.RED, bcolors.END))
+            return  # Finish tests
+
+        # Obfuscators from a fixed base table
+        attach_table(pk, window=4)
+        fixed_ok = dec(enc(TEST_MSG, pk), sk, pk) == TEST_MSG
+        detach_table(pk)
+
+        if not fixed_ok:  # Error found - Wrong fixed base obfuscator
+            print("{}Wrong decrypt with the fixed base table{}".format(bcolors.RED, bcolors.END))
+            return  # Finish tests
+
     print(f"{bcolors.GREEN}No error while creating the keys-enc-dec {TICK}{bcolors.END}")  # Tests passed
 
 
+@main.command(help='Check the zero test and the decryption over the whole plain text space')
+@key_options
+def test_zero(key_file=None, save_key=None, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Zero Test'))
+    print("Executing...")
+
+    pk, sk = get_keys(key_file, save_key, key_len)
+    if pk is None:
+        return -1
+
+    n_s = pk.n_s  # Size of the plain text space
+    p, q = (sk.p, sk.q) if sk.p is not None else (1, 1)  # No prime factors - Only the values around 0 and n
+
+    # Values around the prime factors and the end of the space, where the CRT and the p^2 arithmetic can fail
+    msg_list = {0, 1, 2, p - 1, p, p + 1, 2 * p, q - 1, q, q + 1, 2 * q, pk.n - p, pk.n - q, pk.n - 1, n_s - 1}
+    msg_list = sorted(m for m in msg_list if 0 <= m < n_s)
+    msg_list += [random.randrange(n_s) for _ in range(TEST_ZERO_AMOUNT)]  # Random full range values
+    msg_list += [random.randrange(n_s // p) * p for _ in range(TEST_ZERO_AMOUNT // 10)]  # Random multiples of p
+
+    for msg in msg_list:
+        msg_enc = enc(msg, pk)
+
+        if dec(msg_enc, sk, pk) != msg:  # Error found - Wrong decryption
+            print("{}Wrong decrypt of {}: {}{}".format(bcolors.RED, msg, dec(msg_enc, sk, pk), bcolors.END))
+            return -1
+
+        # The zero test only looks at m mod p, so it is exact for 0 <= m < p
+        zero = msg % sk.p == 0 if sk.p is not None else msg == 0
+        if is_zero(msg_enc, sk, pk) != zero:  # Error found - Wrong zero test
+            print("{}Wrong zero test of {}{}".format(bcolors.RED, msg, bcolors.END))
+            return -1
+
+    print(f"{bcolors.GREEN}No error in the zero test of {len(msg_list)} values {TICK}{bcolors.END}")  # Tests passed
+    return 0
+
+
+@main.command(help='Run the Secure Comparison Protocol over random values and check the results')
+@key_options
+def test_sqp(key_file=None, save_key=None, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('SQP Test'))
+    print("Executing...")
+
+    pk, sk = get_keys(key_file, save_key, key_len)  # Create key
+    if pk is None:
+        return
+
+    # Random pairs for all the lengths
+    for l_i in TIM_L:
+        two_to_l = 2 ** l_i
+
+        for _ in range(TEST_SQP_PAIRS):
+            num1 = random.randrange(two_to_l)
+            num2 = random.randrange(two_to_l)
+
+            # Run the steps of the protocol
+            z = calc_z(enc(num1, pk), enc(num2, pk), pk, two_to_l)
+            c, r = calc_c(z, l_i, SEC_PARAM, pk)
+            c_encrypt = calc_c_list(c, sk, pk, l_i, two_to_l)
+            e_list = calc_e_list(r, c_encrypt, pk, l_i, two_to_l)
+
+            # Expected e values: e_i = 1 + c_i - r_i + sum_{j > i} (c_j XOR r_j)
+            d = dec(c, sk, pk) % two_to_l
+            r_mod = r % two_to_l
+            c_bits = [(d >> i) & 1 for i in range(l_i)]
+            r_bits = [(r_mod >> i) & 1 for i in range(l_i)]
+            e_plain = [1 + c_bits[i] - r_bits[i] + sum(c_bits[j] ^ r_bits[j] for j in range(i + 1, l_i))
+                       for i in range(l_i)]
+
+            if [dec(e_i, sk, pk) for e_i in e_list] != e_plain:  # Error found - Wrong e values
+                print(f"{bcolors.RED}Wrong e values comparing {num1} and {num2}{bcolors.END}")
+                return
+
+            result_cpm = calc_final_z(c, r, l_i, check_e(e_list, pk, sk), sk, pk, two_to_l)
+
+            if result_cpm != int(num1 >= num2):  # Error found - Wrong comparison
+                print(f"{bcolors.RED}Wrong comparison of {num1} and {num2}: {result_cpm}{bcolors.END}")
+                return
+
+        # Comparisons against public values
+        num1 = random.randrange(two_to_l)
+        bounds = sorted(random.randrange(two_to_l) for _ in range(TEST_SQP_PAIRS))
+        bounds[0] = num1  # Equal boundary
+
+        num1_enc = enc(num1, pk)
+        if sqp_const(num1_enc, bounds[-1], pk, sk, l_i) != int(num1 >= bounds[-1]):
+            print(f"{bcolors.RED}Wrong comparison of {num1} and the public {bounds[-1]}{bcolors.END}")
+            return
+
+        bounds.sort()
+        if sqp_const_many(num1_enc, bounds, pk, sk, l_i) != [int(num1 >= b) for b in bounds]:
+            print(f"{bcolors.RED}Wrong comparison of {num1} and the public boundaries {bounds}{bcolors.END}")
+            return
+
+        print(f"{bcolors.LIGHT_BLUE}Length {l_i}: {TEST_SQP_PAIRS} comparisons correct{bcolors.END}")
+
+    print(f"{bcolors.GREEN}No error in the Secure Comparison Protocol {TICK}{bcolors.END}")  # Tests passed
+
+
 @main.command(help='Run the Secure Comparison Protocol')
 @click.option('--verbose', '-v', is_flag=True, help='Set the verbose to true')
 @click.option('--interactive', '-i', is_flag=True, help='Ask for the values to the user')
-def comp(input_num_1=None, input_num_2=None, verbose=False, interactive=False):
+@click.option('--obf-pool', type=int, default=0, help='Capacity of the background obfuscator pool. 0 disables it')
+@click.option('--bundle-file', type=click.Path(exists=True, dir_okay=False),
+              help='Use the comparison material precomputed into this file. The material used is removed from it')
+@click.option('--workers', '-w', type=int, help='Worker processes to calculate and check the e values')
+@key_options
+def comp(input_num_1=None, input_num_2=None, verbose=False, interactive=False, obf_pool=0, bundle_file=None,
+         workers=None, key_file=None, save_key=None, key_len=KEY_LEN):
     # Get the numbers to compare from the user
     if interactive:
         verbose = True  # Set verbose to true if the user is introducing the values
@@ -124,7 +360,12 @@ def comp(input_num_1=None, input_num_2=None, verbose=False, interactive=False):
         num2 = TEST_NUM2
 
     # Key generation
-    pk, sk = key_gen()
+    pk, sk = get_keys(key_file, save_key, key_len)
+    if pk is None:
+        return
+
+    # Start precomputing the obfuscators for the encryptions
+    pool = attach_pool(pk, obf_pool) if obf_pool > 0 else None
 
     # Encryption of the numbers to be compared
     num1_enc = enc(num1, pk)
@@ -133,8 +374,25 @@ def comp(input_num_1=None, input_num_2=None, verbose=False, interactive=False):
     # Maximum length of the input messages
     msg_len = max(len(str(num_to_bin(num1))), len(str(num_to_bin(num2))))
 
+    # Precomputed material of the comparison
+    mat = None
+    if bundle_file is not None:
+        try:
+            mat = take_bundle(bundle_file, pk, msg_len)  # Single use, it is removed from the file
+        except ValueError as err:  # Bundles from another key
+            print(f"{bcolors.RED}Error: {err}{bcolors.END}")
+            return
+
+        if mat is None:
+            print(f"{bcolors.RED}Error: No bundle of at least {msg_len} bits in {bundle_file}{bcolors.END}")
+            return
+        msg_len = mat.msg_len
+
     # Call to the Secure Comparison Protocol method
-    result_cpm = sqp(num1_enc, num2_enc, pk, sk, msg_len)
+    try:
+        result_cpm = sqp(num1_enc, num2_enc, pk, sk, msg_len, mat, workers)
+    finally:
+        close_e_pools()  # Stop the worker processes of the e values
 
     if verbose:
         # Printing the result of the comparison
@@ -149,10 +407,88 @@ def comp(input_num_1=None, input_num_2=None, verbose=False, interactive=False):
         else:  # Error
             print(f"{bcolors.ERR}Incorrect result from comparison: {result_cpm}{bcolors.END}")
 
+        print_sqp_stats(msg_len)
+
+    if pool is not None:
+        if verbose:
+            print_pool_stats(pool)
+        detach_pool(pk)
+
+
+@main.command(help='Run the Secure Equality Test')
+@click.option('--verbose', '-v', is_flag=True, help='Set the verbose to true')
+@click.option('--interactive', '-i', is_flag=True, help='Ask for the values to the user')
+@click.option('--obf-pool', type=int, default=0, help='Capacity of the background obfuscator pool. 0 disables it')
+@key_options
+def eq(input_num_1=None, input_num_2=None, verbose=False, interactive=False, obf_pool=0, key_file=None,
+       save_key=None, key_len=KEY_LEN):
+    # Get the numbers to compare from the user
+    if interactive:
+        verbose = True  # Set verbose to true if the user is introducing the values
+
+        # Get the inputs from the user
+        try:
+            input_num_1 = int(input("First number to compare: "))
+            input_num_2 = int(input("Second number to compare: "))
+
+            # Negative numbers not supported
+            if input_num_1 < 0 or input_num_2 < 0:
+                print("{}Wrong input format: Introduce positive numbers please{}".format(bcolors.RED, bcolors.END))
+
+        # Wrong format for the inputs from the user
+        except:
+            print("{}Wrong input format{}".format(bcolors.RED, bcolors.END))
+            return
+
+    # Check if the input to chose is the Test values or values passed as arguments
+    if input_num_1 is not None and input_num_2 is not None:  # Argument values
+        num1 = input_num_1
+        num2 = input_num_2
+    else:  # Test values
+        num1 = TEST_NUM1
+        num2 = TEST_NUM2
+
+    if verbose:  # Print only if verbose flag is added in the execution command
+        f = Figlet(font='slant')  # Useless cool text
+        print(f.renderText('EQT'))
+        print("\tComparing {} and {}\n".format(num1, num2))  # Intro info message
+
+    # Key generation
+    pk, sk = get_keys(key_file, save_key, key_len)
+    if pk is None:
+        return
+
+    # Start precomputing the obfuscators for the encryptions
+    pool = attach_pool(pk, obf_pool) if obf_pool > 0 else None
+
+    # Call to the Secure Equality Test method
+    result_eq = eqt(enc(num1, pk), enc(num2, pk), pk, sk)
+
+    if verbose:
+        # Printing the result of the equality test
+        print("{}{} Results from Secure Equality Test {}{}\n".format(bcolors.BLUE, SQP_TXT_AUX, SQP_TXT_AUX,
+                                                                     bcolors.END))
+        if result_eq == 1:
+            print("{}{} is equal to {}{}".format(bcolors.LIGHT_BLUE, num1, num2, bcolors.END))
+        else:
+            print("{}{} is not equal to {}{}".format(bcolors.LIGHT_BLUE, num1, num2, bcolors.END))
+
+    if pool is not None:
+        if verbose:
+            print_pool_stats(pool)
+        detach_pool(pk)
+
 
 @main.command(help='Runs the SQP and stores the time data into csv files')
 @click.option('-l', required=False)
-def timer(l=None):
+@click.option('--obf-pool', type=int, default=0, help='Capacity of the background obfuscator pool. 0 disables it')
+@click.option('--offline', is_flag=True, help='Time the offline material and the online comparison separately')
+@click.option('--workers', '-w', type=int, help='Worker processes to calculate and check the e values')
+@click.option('--dgk', is_flag=True, help='Run the bitwise part of the comparison under DGK')
+@click.option('--eq', 'equality', is_flag=True, help='Time the Secure Equality Test instead of the comparison')
+@key_options
+def timer(l=None, obf_pool=0, offline=False, workers=None, dgk=False, equality=False, key_file=None,
+          save_key=None, key_len=KEY_LEN):
     """
     Generates the Graphs
     """
@@ -186,6 +522,14 @@ def timer(l=None):
         # Sort the list
         l_list.sort()
 
+    if equality and (dgk or offline or workers is not None):  # Only options of the comparison
+        print(f"{bcolors.RED}Error: --eq can not be used with --dgk, --offline or --workers{bcolors.END}")
+        return -1
+
+    if dgk and offline:  # The DGK bits of c are encrypted online, so the offline bit encryptions are not used
+        print(f"{bcolors.RED}Error: --offline can not be used with --dgk{bcolors.END}")
+        return -1
+
     # Create the list of values
     val_list = create_val_list(l_list)
 
@@ -198,37 +542,151 @@ def timer(l=None):
         create_folder(file_path + "/" + folder)
 
     # Key generation for the execution
-    pk, sk = key_gen()
-
-    # Run the executions and save the execution times
-    for l_idx, l_i in enumerate(l_list):
-        time_list = []  # List with execution times
-
-        for val_idx, val in enumerate(val_list[l_idx]):
-            # Encryption of the numbers to be compared
-            num1_enc = enc(val[0], pk)
-            num2_enc = enc(val[1], pk)
-
-            # Maximum length of the input messages
-            msg_len = max(len(str(num_to_bin(val[0]))), len(str(num_to_bin(val[1]))))
-
-            exe_time = timeit(lambda: sqp(num1_enc, num2_enc, pk, sk, msg_len), number=EXE_REP)
-            time_list.append(exe_time/EXE_REP)
-
-        # Check which is the length of the next list of executions
-        if l_i == 10:
-            out_file = data_folder + TIM_10_F + TIM_10_CSV  # Save the correct output file for later use
-        elif l_i == 20:
-            out_file = data_folder + TIM_20_F + TIM_20_CSV
-        elif l_i == 50:
-            out_file = data_folder + TIM_50_F + TIM_50_CSV
-        elif l_i == 100:
-            out_file = data_folder + TIM_100_F + TIM_100_CSV
-        else:  # Error length
-            print(f"{bcolors.RED}Wrong length used{bcolors.END}")
-            return
+    pk, sk = get_keys(key_file, save_key, key_len)
+    if pk is None:
+        return -1
+
+    # Start precomputing the obfuscators for the encryptions
+    pool = attach_pool(pk, obf_pool) if obf_pool > 0 else None
+
+    dgk_keys = None
+    if dgk:  # DGK keys of the same length as the Paillier ones
+        key_list = []
+        key_time = timeit(lambda: key_list.append(dgk_key_gen(pk.n.bit_length())), number=1)
+        dgk_keys = key_list[0]
+        print(f"{bcolors.LIGHT_BLUE}DGK key generation: {key_time:.3f} s{bcolors.END}")
+
+    try:
+        # Run the executions and save the execution times
+        for l_idx, l_i in enumerate(l_list):
+            sqp_stats.reset()  # Counters of this length
+            time_list = []  # List with execution times
+            offline_list = []  # List with execution times of the offline phase
+
+            for val_idx, val in enumerate(val_list[l_idx]):
+                # Encryption of the numbers to be compared
+                num1_enc = enc(val[0], pk)
+                num2_enc = enc(val[1], pk)
+
+                # Maximum length of the input messages
+                msg_len = max(len(str(num_to_bin(val[0]))), len(str(num_to_bin(val[1]))))
+
+                if equality:  # Equality test of the same pair
+                    exe_time = timeit(lambda: eqt(num1_enc, num2_enc, pk, sk), number=EXE_REP)
+                elif offline:
+                    # Offline phase: material of the comparison
+                    mat_list = []
+                    off_time = timeit(lambda: mat_list.append(calc_material(pk, msg_len)), number=EXE_REP)
+                    offline_list.append(off_time/EXE_REP)
+
+                    # Online phase: each comparison with its own precomputed material
+                    mat_iter = iter(mat_list)
+                    exe_time = timeit(lambda: sqp(num1_enc, num2_enc, pk, sk, msg_len, next(mat_iter), workers,
+                                                  dgk_keys), number=EXE_REP)
+                else:
+                    exe_time = timeit(lambda: sqp(num1_enc, num2_enc, pk, sk, msg_len, workers=workers,
+                                                  dgk_keys=dgk_keys), number=EXE_REP)
+                time_list.append(exe_time/EXE_REP)
+
+            # Check which is the length of the next list of executions
+            if l_i == 10:
+                out_file = data_folder + TIM_10_F + TIM_10_CSV  # Save the correct output file for later use
+            elif l_i == 20:
+                out_file = data_folder + TIM_20_F + TIM_20_CSV
+            elif l_i == 50:
+                out_file = data_folder + TIM_50_F + TIM_50_CSV
+            elif l_i == 100:
+                out_file = data_folder + TIM_100_F + TIM_100_CSV
+            else:  # Error length
+                print(f"{bcolors.RED}Wrong length used{bcolors.END}")
+                return
+
+            if equality:  # Keep the comparison times
+                out_file = add_suffix(out_file, EQ_SUF)
+            else:
+                print_sqp_stats(l_i)
+
+            if dgk:  # Keep the Paillier only times
+                out_file = add_suffix(out_file, DGK_SUF)
+
+            if offline:  # Save both phases apart
+                save_time(add_suffix(out_file, OFFLINE_SUF), offline_list, l_i)
+                save_time(add_suffix(out_file, ONLINE_SUF), time_list, l_i)
+                print(f"{bcolors.LIGHT_BLUE}Length {l_i}: offline {sum(offline_list) / len(offline_list):.3f} s, "
+                      f"online {sum(time_list) / len(time_list):.3f} s{bcolors.END}")
+            else:
+                save_time(out_file, time_list, l_i)
+    finally:
+        close_e_pools()  # Stop the worker processes of the e values
+
+    if pool is not None:
+        print_pool_stats(pool)
+        detach_pool(pk)
+    return 0
+
+
+@main.command(name='keygen', help='Generates keys ahead of time and saves them into the key store')
+@click.option('--pool', '-p', type=int, default=1, help='Amount of keys generated for each length')
+@click.option('--key-len', '-k', default=str(KEY_LEN), help='Comma separated list of key lengths in bits')
+@click.option('--key-dir', type=click.Path(file_okay=False), help='Folder of the key store')
+def keygen_cmd(pool=1, key_len=str(KEY_LEN), key_dir=None):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Key Gen'))
+
+    try:
+        len_list = [int(len_i) for len_i in key_len.split(",")]
+    except ValueError:  # Wrong format
+        print(f"{bcolors.RED}Error: Wrong format for the key lengths{bcolors.END}")
+        return -1
+
+    if key_dir is None:  # Default key store
+        key_dir = get_key_dir()
+
+    # Generate and save the keys for all the lengths
+    for len_i in len_list:
+        for _ in range(pool):
+            pk, sk = key_gen(len_i)
+            path = store_path(pk, len_i, key_dir)
+            save_keys(path, pk, sk)
+            print(f"{bcolors.LIGHT_BLUE}{path}{bcolors.END}")
+
+    print(f"{bcolors.GREEN}{pool * len(len_list)} keys saved into {key_dir} {TICK}{bcolors.END}")
+    return 0
+
 
-        save_time(out_file, time_list, l_i)
+@main.command(help='Precomputes the offline material of the Secure Comparison Protocol')
+@click.option('--amount', '-n', type=int, default=1, help='Amount of bundles for each length')
+@click.option('-l', default=",".join(str(l_i) for l_i in TIM_L), help='Comma separated list of message lengths')
+@key_options
+def precompute(amount=1, l=None, key_file=None, save_key=None, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Precompute'))
+
+    # The bundles can only be used with the same key later
+    if key_file is None and save_key is None:
+        print(f"{bcolors.RED}Error: Use --key-file or --save-key to keep the key of the bundles{bcolors.END}")
+        return -1
+
+    try:
+        l_list = [int(l_i) for l_i in l.split(",")]
+    except ValueError:  # Wrong format
+        print(f"{bcolors.RED}Error: Wrong format for the length{bcolors.END}")
+        return -1
+
+    pk, sk = get_keys(key_file, save_key, key_len)
+    if pk is None:
+        return -1
+
+    bundle_dir = os.path.dirname(os.path.realpath(__file__)) + "/" + BUNDLE_DIR
+
+    # Calculate and save the bundles of each length
+    for l_i in l_list:
+        bundles = [calc_material(pk, l_i) for _ in range(amount)]
+        path = bundle_path(pk, l_i, bundle_dir)
+        save_bundles(path, pk, bundles)
+        print(f"{bcolors.LIGHT_BLUE}{path}{bcolors.END}")
+
+    print(f"{bcolors.GREEN}{amount * len(l_list)} bundles saved {TICK}{bcolors.END}")
     return 0
 
 
@@ -243,4 +701,195 @@ def graph():
     return 0
 
 
-main()  # Runs the cli
+@main.group(help='Runs the performance benchmarks')
+def bench():
+    pass
+
+
+@bench.command(help='Throughput of the batch encryption/decryption for different amounts of workers')
+@click.option('--amount', '-n', type=int, default=BENCH_AMOUNT, help='Amount of values to encrypt and decrypt')
+@click.option('--workers', '-w', required=False, help='Comma separated list with the amounts of workers')
+@click.option('--chunk', type=int, default=BATCH_CHUNK, help='Amount of values sent to a worker at once')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def batch(amount=BENCH_AMOUNT, workers=None, chunk=BATCH_CHUNK, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Batch'))
+
+    worker_list = None  # Default list of workers
+    if workers is not None:
+        try:
+            worker_list = [int(w_i) for w_i in workers.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the workers{bcolors.END}")
+            return -1
+
+    return bench_batch(amount, worker_list, chunk, key_len)
+
+
+@bench.command(name='keygen', help='Key generation time of the random prime search against the sieved search')
+@click.option('--reps', '-r', type=int, default=BENCH_KEY_REP, help='Amount of keys generated with each method')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the keys in bits')
+def bench_keygen_cmd(reps=BENCH_KEY_REP, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Key Gen'))
+    return bench_keygen(reps, key_len)
+
+
+@bench.command(help='EncryptedNumber operations against the secure_* functions on int ciphertexts')
+@click.option('--amount', '-n', type=int, default=BENCH_AMOUNT, help='Amount of pairs of ciphertexts')
+@click.option('--reps', '-r', type=int, default=BENCH_NUMBER_REP, help='Times each operation goes through the pairs')
+@click.option('-l', type=int, default=max(TIM_L), help='Length of the scalar in bits')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def number(amount=BENCH_AMOUNT, reps=BENCH_NUMBER_REP, l=max(TIM_L), key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Number'))
+    return bench_number(amount, reps, l, key_len)
+
+
+@bench.command(help='Comparisons per second of sqp() in a loop against sqp_many()')
+@click.option('--amount', '-n', type=int, default=BENCH_SQP_PAIRS, help='Amount of pairs compared')
+@click.option('-l', type=int, default=max(TIM_L), help='Length of the compared numbers in bits')
+@click.option('--workers', '-w', type=int, default=BATCH_WORKERS, help='Amount of worker processes')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def many(amount=BENCH_SQP_PAIRS, l=max(TIM_L), workers=BATCH_WORKERS, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('SQP Many'))
+    return bench_sqp_many(amount, l, workers, key_len)
+
+
+@bench.command(help='Bucketing with sqp() against encrypted boundaries and with sqp_const_many()')
+@click.option('--amount', '-n', type=int, default=BENCH_SQP_PAIRS, help='Amount of encrypted numbers')
+@click.option('--buckets', '-b', type=int, default=BENCH_BUCKETS, help='Amount of public boundaries')
+@click.option('-l', type=int, default=max(TIM_L), help='Length of the numbers in bits')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def const(amount=BENCH_SQP_PAIRS, buckets=BENCH_BUCKETS, l=max(TIM_L), key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('SQP Const'))
+    return bench_const(amount, buckets, l, key_len)
+
+
+@bench.command(help='Rounds, comparisons and time of the tournament argmax, argmin and top-k')
+@click.option('--amount', '-n', required=False, help='Comma separated list with the amounts of numbers')
+@click.option('-l', type=int, default=BENCH_SELECT_LEN, help='Length of the numbers in bits')
+@click.option('-k', type=int, default=BENCH_TOP_K, help='Amount of numbers of the top-k')
+@click.option('--workers', '-w', type=int, default=BATCH_WORKERS, help='Amount of worker processes')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def select(amount=None, l=BENCH_SELECT_LEN, k=BENCH_TOP_K, workers=BATCH_WORKERS, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Select'))
+
+    size_list = None  # Default list of amounts
+    if amount is not None:
+        try:
+            size_list = [int(n_i) for n_i in amount.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the amounts{bcolors.END}")
+            return -1
+
+    return bench_select(size_list, l, k, workers, key_len)
+
+
+@bench.command(help='Traffic and time of the two party comparison over an asyncio channel')
+@click.option('--amount', '-n', type=int, default=NET_PAIRS, help='Amount of pairs compared')
+@click.option('-l', type=int, default=max(TIM_L), help='Length of the compared numbers in bits')
+@click.option('--pipeline', '-p', required=False, help='Comma separated list with the comparisons in flight')
+@click.option('--tcp', is_flag=True, help='Use a localhost TCP connection instead of an in memory pipe')
+@click.option('--delay', type=float, default=0, help='One way latency of the in memory pipe in milliseconds')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def net(amount=NET_PAIRS, l=max(TIM_L), pipeline=None, tcp=False, delay=0, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Net'))
+
+    pipeline_list = None  # Default list of comparisons in flight
+    if pipeline is not None:
+        try:
+            pipeline_list = [int(p_i) for p_i in pipeline.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the comparisons in flight{bcolors.END}")
+            return -1
+
+    return bench_net(amount, l, pipeline_list, tcp, delay / 1000, key_len)
+
+
+@bench.command(help='Values encrypted per second one per ciphertext against packed into slots')
+@click.option('--amount', '-n', type=int, default=BENCH_AMOUNT, help='Amount of values')
+@click.option('-l', type=int, default=max(TIM_L), help='Length of the values in bits')
+@click.option('--headroom', type=int, default=PACK_HEADROOM, help='Extra bits of each slot')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of the key in bits')
+def pack(amount=BENCH_AMOUNT, l=max(TIM_L), headroom=PACK_HEADROOM, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Packing'))
+    return bench_pack(amount, l, headroom, key_len)
+
+
+@bench.command(help='Ciphertext expansion and throughput of Damgard-Jurik for different values of s')
+@click.option('--amount', '-n', type=int, default=BENCH_DJ_AMOUNT, help='Amount of plain texts encrypted')
+@click.option('-s', 's_list', required=False, help='Comma separated list with the values of s')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of n in bits')
+def dj(amount=BENCH_DJ_AMOUNT, s_list=None, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Damgard-Jurik'))
+
+    if s_list is not None:
+        try:
+            s_list = [int(s_i) for s_i in s_list.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the values of s{bcolors.END}")
+            return -1
+
+    return bench_dj(amount, s_list, key_len)
+
+
+@bench.command(help='Encryption with fixed base tables of short exponents against r^n mod n^2')
+@click.option('--amount', '-n', type=int, default=BENCH_AMOUNT, help='Amount of values encrypted')
+@click.option('--window', '-w', 'window_list', required=False, help='Comma separated list with the windows')
+@click.option('--exp-bits', type=int, default=FIXED_EXP_BITS, help='Bits of the short random exponents')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of n in bits')
+def fixed(amount=BENCH_AMOUNT, window_list=None, exp_bits=FIXED_EXP_BITS, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Fixed Base'))
+
+    if window_list is not None:
+        try:
+            window_list = [int(w_i) for w_i in window_list.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the windows{bcolors.END}")
+            return -1
+
+    table_dir = os.path.dirname(os.path.realpath(__file__)) + "/" + TABLE_DIR
+    return bench_fixed(amount, window_list, exp_bits, key_len, table_dir)
+
+
+@bench.command(help='Sum and dot product of encrypted vectors against the naive loop')
+@click.option('--size', '-n', 'size_list', required=False, help='Comma separated list with the lengths of the vectors')
+@click.option('--bits', type=int, default=BENCH_VEC_BITS, help='Bits of the plain text weights')
+@click.option('--workers', '-w', type=int, default=1, help='Amount of worker processes. 1 runs them in this process')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of n in bits')
+def vec(size_list=None, bits=BENCH_VEC_BITS, workers=1, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Encrypted Vector'))
+
+    if size_list is not None:
+        try:
+            size_list = [int(s_i) for s_i in size_list.split(",")]
+        except ValueError:  # Wrong format
+            print(f"{bcolors.RED}Error: Wrong format for the lengths{bcolors.END}")
+            return -1
+
+    return bench_vec(size_list, bits, workers, key_len)
+
+
+@bench.command(help='Writing and reading a ciphertext file against a list of ints')
+@click.option('--amount', '-n', type=int, default=BENCH_CT_AMOUNT, help='Amount of ciphertexts')
+@click.option('--reads', type=int, default=BENCH_CT_READS, help='Amount of ciphertexts read at random indexes')
+@click.option('--key-len', type=int, default=KEY_LEN, help='Length of n in bits')
+def file(amount=BENCH_CT_AMOUNT, reads=BENCH_CT_READS, key_len=KEY_LEN):
+    f = Figlet(font='slant')  # Useless cool text
+    print(f.renderText('Ciphertext File'))
+
+    ct_dir = os.path.dirname(os.path.realpath(__file__)) + "/" + CT_DIR
+    return bench_file(amount, reads, key_len, ct_dir)
+
+
+if __name__ == "__main__":
+    main()  # Runs the cli
@@ -0,0 +1,543 @@
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from src.constants.const import *
+from src.functions.bcolors import bcolors
+from src.paillier.paillier import key_gen, get_prime_random, enc, dec, as_number, sqp, sqp_const_many, \
+    secure_addition, secure_scalar_mult, secure_neg
+from src.paillier.paillier_batch import enc_many, dec_many
+from src.paillier.paillier_file import CiphertextReader, save_ciphertexts, load_ciphertexts
+from src.paillier.paillier_fixed import attach_table, detach_table
+from src.paillier.paillier_packing import Packing, enc_packed, dec_packed
+from src.paillier.paillier_vector import enc_vector
+from src.sqp.sqp_batch import sqp_many
+from src.sqp.sqp_select import argmax, argmin, top_k
+from src.sqp.sqp_net import run_memory, run_tcp
+from src.paillier.paillier_store import save_table, load_table, table_path
+
+
+def print_header(title):
+    """
+    Prints the header of a benchmark
+    :param title: Name of the benchmark
+    :return:
+    """
+    print(f"{bcolors.BLUE}{SQP_TXT_AUX} {title} {SQP_TXT_AUX}{bcolors.END}\n")
+
+
+def print_row(label, elapsed, amount, unit):
+    """
+    Prints the result of one run of a benchmark
+    :param label: Name of the run
+    :param elapsed: Execution time in seconds
+    :param amount: Amount of operations done in the run
+    :param unit: Name of the operations done
+    :return:
+    """
+    print(f"{bcolors.LIGHT_BLUE}{label:<24}{bcolors.END}{elapsed:10.3f} s{amount / elapsed:12.1f} {unit}/s")
+
+
+def remove_file(path):
+    """
+    Removes a file written by a benchmark, and its folder if it is left empty
+    :param path: Path of the file
+    :return:
+    """
+    os.remove(path)
+
+    folder = os.path.dirname(path)
+    if folder and not os.listdir(folder):
+        os.rmdir(folder)
+
+
+def bench_batch(amount=BENCH_AMOUNT, worker_list=None, chunk_size=BATCH_CHUNK, key_len=KEY_LEN):
+    """
+    Measures the throughput of enc_many() and dec_many() for different amounts of workers
+    :param amount: Amount of values encrypted and decrypted in each run
+    :param worker_list: List with the amount of workers to test. By default 1, 2, 4... up to the amount of cores
+    :param chunk_size: Amount of values sent to a worker at once
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    # Default list of workers: powers of two up to the amount of cores
+    if worker_list is None:
+        worker_list = [1]
+        while worker_list[-1] * 2 <= os.cpu_count():
+            worker_list.append(worker_list[-1] * 2)
+
+    pk, sk = key_gen(key_len)
+    values = [random.randrange(2 ** max(TIM_L)) for _ in range(amount)]
+
+    print_header(f"Batch encryption/decryption of {amount} values")
+
+    for workers in worker_list:
+        start = time.perf_counter()
+        ciphertexts = enc_many(values, pk, workers, chunk_size)
+        print_row(f"enc_many {workers} workers", time.perf_counter() - start, amount, "enc")
+
+        start = time.perf_counter()
+        decrypted = dec_many(ciphertexts, sk, pk, workers, chunk_size)
+        print_row(f"dec_many {workers} workers", time.perf_counter() - start, amount, "dec")
+
+        if decrypted != values:  # The batch went wrong
+            print(f"{bcolors.RED}Wrong decryption with {workers} workers{bcolors.END}")
+            return -1
+    return 0
+
+
+def bench_keygen(reps=BENCH_KEY_REP, key_len=KEY_LEN):
+    """
+    Compares the key generation time of the original random prime search against the sieved search
+    :param reps: Amount of keys generated with each method
+    :param key_len: Length of the keys in bits
+    :return:
+    """
+    p_len = key_len // 2
+
+    print_header(f"Key generation of {reps} keys of {key_len} bits")
+
+    # Before: random candidates with 128 Miller-Rabin rounds, p and q one after the other
+    start = time.perf_counter()
+    for _ in range(reps):
+        get_prime_random(p_len), get_prime_random(p_len)
+    print_row("random search", time.perf_counter() - start, reps, "keys")
+
+    # Sieved incremental search, p and q one after the other
+    start = time.perf_counter()
+    for _ in range(reps):
+        key_gen(key_len, parallel=False)
+    print_row("sieved search", time.perf_counter() - start, reps, "keys")
+
+    # After: sieved incremental search, p and q at the same time
+    start = time.perf_counter()
+    for _ in range(reps):
+        key_gen(key_len)
+    print_row("sieved search parallel", time.perf_counter() - start, reps, "keys")
+    return 0
+
+
+def bench_number(amount=BENCH_AMOUNT, reps=BENCH_NUMBER_REP, scalar_len=max(TIM_L), key_len=KEY_LEN):
+    """
+    Compares the homomorphic operations of EncryptedNumber against the secure_* functions on bare int ciphertexts.
+    Both run over the same ciphertexts, so their results have to be the same
+    :param amount: Amount of pairs of ciphertexts
+    :param reps: Amount of times each operation goes through all the pairs
+    :param scalar_len: Length of the scalar of the scalar multiplication in bits
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    pk, sk = key_gen(key_len)
+    int_pairs = [(enc(random.randrange(2 ** max(TIM_L)), pk), enc(random.randrange(2 ** max(TIM_L)), pk))
+                 for _ in range(amount)]
+    num_pairs = [(as_number(c_1, pk), as_number(c_2, pk)) for c_1, c_2 in int_pairs]
+    scalar = random.randrange(2 ** scalar_len)
+
+    print_header(f"Operations on {amount} pairs of ciphertexts {reps} times and n of {key_len} bits")
+
+    # Name, operation on bare ints and the same operation on EncryptedNumber
+    op_list = [("addition", lambda c_1, c_2: secure_addition(c_1, c_2, pk), lambda x_1, x_2: x_1 + x_2),
+               ("scalar mult", lambda c_1, _: secure_scalar_mult(c_1, scalar, pk), lambda x_1, _: x_1 * scalar),
+               ("negation", lambda c_1, _: secure_neg(c_1, pk), lambda x_1, _: -x_1)]
+
+    for name, int_op, num_op in op_list:
+        start = time.perf_counter()
+        for _ in range(reps):
+            int_res = [int_op(c_1, c_2) for c_1, c_2 in int_pairs]
+        print_row(f"int {name}", time.perf_counter() - start, reps * amount, "op")
+
+        start = time.perf_counter()
+        for _ in range(reps):
+            num_res = [num_op(x_1, x_2) for x_1, x_2 in num_pairs]
+        print_row(f"number {name}", time.perf_counter() - start, reps * amount, "op")
+
+        if [int(c_i) for c_i in int_res] != [int(x_i) for x_i in num_res]:  # The two ways do not agree
+            print(f"{bcolors.RED}Different results of the {name}{bcolors.END}")
+            return -1
+    return 0
+
+
+def bench_sqp_many(amount=BENCH_SQP_PAIRS, msg_len=max(TIM_L), workers=BATCH_WORKERS, key_len=KEY_LEN):
+    """
+    Compares the comparisons per second of sqp() in a loop against sqp_many()
+    :param amount: Amount of pairs compared
+    :param msg_len: Length of the compared numbers in bits
+    :param workers: Amount of worker processes of sqp_many(). None uses all the cores
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    pk, sk = key_gen(key_len)
+    values = [(random.randrange(2 ** msg_len), random.randrange(2 ** msg_len)) for _ in range(amount)]
+    pairs = [(enc(a, pk), enc(b, pk)) for a, b in values]
+    expected = [int(a >= b) for a, b in values]
+
+    print_header(f"Comparison of {amount} pairs of {msg_len} bits")
+
+    # sqp() one pair after the other
+    start = time.perf_counter()
+    loop_res = [sqp(num1, num2, pk, sk, msg_len) for num1, num2 in pairs]
+    print_row("sqp() loop", time.perf_counter() - start, amount, "comp")
+
+    # sqp_many() with the shared constants and the pool of processes
+    start = time.perf_counter()
+    many_res = [None] * amount
+    for idx, result in sqp_many(pairs, pk, sk, msg_len, workers):
+        many_res[idx] = result
+    print_row("sqp_many()", time.perf_counter() - start, amount, "comp")
+
+    if loop_res != expected or many_res != expected:  # Wrong comparisons
+        print(f"{bcolors.RED}Wrong comparison results{bcolors.END}")
+        return -1
+    return 0
+
+
+def bench_const(amount=BENCH_SQP_PAIRS, buckets=BENCH_BUCKETS, msg_len=max(TIM_L), key_len=KEY_LEN):
+    """
+    Compares the bucketing of encrypted numbers with sqp() against encrypted boundaries
+    and with sqp_const_many() against the public boundaries
+    :param amount: Amount of encrypted numbers
+    :param buckets: Amount of boundaries
+    :param msg_len: Length of the numbers in bits
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    pk, sk = key_gen(key_len)
+    values = [random.randrange(2 ** msg_len) for _ in range(amount)]
+    bounds = sorted(random.randrange(2 ** msg_len) for _ in range(buckets))
+    enc_values = [enc(a, pk) for a in values]
+    expected = [[int(a >= b) for b in bounds] for a in values]
+
+    print_header(f"Bucketing of {amount} numbers of {msg_len} bits with {buckets} boundaries")
+
+    # sqp() against every encrypted boundary
+    start = time.perf_counter()
+    loop_res = [[sqp(num, enc(b, pk), pk, sk, msg_len) for b in bounds] for num in enc_values]
+    print_row("sqp() per boundary", time.perf_counter() - start, amount, "num")
+
+    # sqp_const_many() with the public boundaries
+    start = time.perf_counter()
+    const_res = [sqp_const_many(num, bounds, pk, sk, msg_len) for num in enc_values]
+    print_row("sqp_const_many()", time.perf_counter() - start, amount, "num")
+
+    if loop_res != expected or const_res != expected:  # Wrong comparisons
+        print(f"{bcolors.RED}Wrong comparison results{bcolors.END}")
+        return -1
+    return 0
+
+
+def bench_select(size_list=None, msg_len=BENCH_SELECT_LEN, k=BENCH_TOP_K, workers=BATCH_WORKERS, key_len=KEY_LEN):
+    """
+    Measures the rounds, comparisons and time of the tournament argmax, argmin and top-k
+    :param size_list: List with the amounts of encrypted numbers
+    :param msg_len: Length of the numbers in bits
+    :param k: Amount of numbers of the top-k
+    :param workers: Amount of worker processes of each round. 1 runs the comparisons in this process
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    size_list = BENCH_SELECT_SIZES if size_list is None else size_list
+    pk, sk = key_gen(key_len)
+
+    for size in size_list:
+        values = [random.randrange(2 ** msg_len) for _ in range(size)]
+        enc_values = [enc(a, pk) for a in values]
+        top = sorted(values, reverse=True)[:k]
+
+        print_header(f"Selection of {size} numbers of {msg_len} bits")
+
+        runs = [("argmax", lambda: argmax(enc_values, pk, sk, msg_len, workers), [max(values)]),
+                ("argmin", lambda: argmin(enc_values, pk, sk, msg_len, workers), [min(values)]),
+                (f"top-{k}", lambda: top_k(enc_values, k, pk, sk, msg_len, True, workers), top)]
+
+        for label, run, expected in runs:
+            start = time.perf_counter()
+            res = run()
+            elapsed = time.perf_counter() - start
+
+            # argmax and argmin return the winner, its index and the stats. top-k the winners and the stats
+            winners, stats = (res[0], res[1]) if len(res) == 2 else ([res[:2]], res[2])
+
+            print_row(label, elapsed, stats.comparisons, "comp")
+            print(f"{'':<24}{stats.rounds:10d} rounds {stats.comparisons:8d} comparisons")
+
+            if [dec(val, sk, pk) for val, _ in winners] != expected:  # Wrong selection
+                print(f"{bcolors.RED}Wrong {label} result{bcolors.END}")
+                return -1
+    return 0
+
+
+def bench_net(amount=NET_PAIRS, msg_len=max(TIM_L), pipeline_list=None, tcp=False, delay=0, key_len=KEY_LEN):
+    """
+    Measures the traffic and the time of the two party comparison over a channel
+    :param amount: Amount of pairs compared
+    :param msg_len: Length of the compared numbers in bits
+    :param pipeline_list: List with the amounts of comparisons in flight
+    :param tcp: Use a localhost TCP connection instead of an in memory pipe
+    :param delay: One way latency of the in memory pipe in seconds
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    pipeline_list = [1, NET_PIPELINE] if pipeline_list is None else pipeline_list
+    pk, sk = key_gen(key_len)
+    values = [(random.randrange(2 ** msg_len), random.randrange(2 ** msg_len)) for _ in range(amount)]
+    pairs = [(enc(a, pk), enc(b, pk)) for a, b in values]
+    expected = [int(a >= b) for a, b in values]
+
+    channel = "localhost TCP" if tcp else f"memory pipe, {delay * 1000:.0f} ms latency"
+    print_header(f"Comparison of {amount} pairs of {msg_len} bits over {channel}")
+
+    for pipeline in pipeline_list:
+        start = time.perf_counter()
+        if tcp:
+            results, stats = asyncio.run(run_tcp(pairs, pk, sk, msg_len, pipeline))
+        else:
+            results, stats = asyncio.run(run_memory(pairs, pk, sk, msg_len, pipeline, delay))
+        elapsed = time.perf_counter() - start
+
+        print_row(f"{pipeline} in flight", elapsed, amount, "comp")
+        print(f"{'':<24}{stats.total_bytes() / amount:10.0f} bytes {stats.round_trips / amount:8.1f} rounds"
+              f" per comparison")
+
+        if list(results) != expected:  # Wrong comparisons
+            print(f"{bcolors.RED}Wrong comparison results{bcolors.END}")
+            return -1
+    return 0
+
+
+def bench_pack(amount=BENCH_AMOUNT, msg_len=max(TIM_L), headroom=PACK_HEADROOM, key_len=KEY_LEN):
+    """
+    Compares the values encrypted and decrypted per second one per ciphertext against packed into slots
+    :param amount: Amount of values
+    :param msg_len: Length of the values in bits
+    :param headroom: Extra bits of each slot
+    :param key_len: Length of the key in bits
+    :return:
+    """
+    pk, sk = key_gen(key_len)
+    packing = Packing(pk, msg_len, headroom)
+    values = [random.randrange(2 ** msg_len) for _ in range(amount)]
+    ct_bytes = (pk.n_2.bit_length() + 7) // 8
+
+    print_header(f"Encryption of {amount} values of {msg_len} bits, {packing.slots} slots of {packing.width} bits")
+
+    # One value per ciphertext
+    start = time.perf_counter()
+    enc_list = [enc(val, pk) for val in values]
+    print_row("enc() unpacked", time.perf_counter() - start, amount, "val")
+
+    start = time.perf_counter()
+    dec_res = [dec(val, sk, pk) for val in enc_list]
+    print_row("dec() unpacked", time.perf_counter() - start, amount, "val")
+    print(f"{'':<24}{len(enc_list) * ct_bytes:10d} bytes of ciphertexts")
+
+    # k values per ciphertext
+    start = time.perf_counter()
+    packed_list = enc_packed(values, packing)
+    print_row("enc_packed()", time.perf_counter() - start, amount, "val")
+
+    start = time.perf_counter()
+    packed_res = dec_packed(packed_list, sk)
+    print_row("dec_packed()", time.perf_counter() - start, amount, "val")
+    print(f"{'':<24}{len(packed_list) * ct_bytes:10d} bytes of ciphertexts")
+
+    if dec_res != values or packed_res != values:  # Wrong decryptions
+        print(f"{bcolors.RED}Wrong decrypted values{bcolors.END}")
+        return -1
+    return 0
+
+
+def bench_dj(amount=BENCH_DJ_AMOUNT, s_list=None, key_len=KEY_LEN):
+    """
+    Measures the ciphertext expansion and the throughput of Damgard-Jurik for different values of s
+    :param amount: Amount of plain texts of the full size encrypted
+    :param s_list: List with the values of s
+    :param key_len: Length of n in bits
+    :return:
+    """
+    s_list = BENCH_DJ_S if s_list is None else s_list
+    print_header(f"Damgard-Jurik with {amount} plain texts and n of {key_len} bits")
+
+    for s in s_list:
+        pk, sk = key_gen(key_len, s=s)
+        pt_bytes = (pk.n_s.bit_length() - 1) // 8  # Full bytes that fit in a plain text
+        ct_bytes = (pk.n_2.bit_length() + 7) // 8
+        values = [random.randrange(2 ** (pt_bytes * 8)) for _ in range(amount)]
+
+        start = time.perf_counter()
+        enc_list = [enc(val, pk) for val in values]
+        elapsed = time.perf_counter() - start
+        print_row(f"s={s} enc()", elapsed, amount, "enc")
+
+        start = time.perf_counter()
+        dec_list = [dec(val, sk, pk) for val in enc_list]
+        print_row(f"s={s} dec()", time.perf_counter() - start, amount, "dec")
+
+        print(f"{'':<24}{ct_bytes / pt_bytes:10.3f} ciphertext bytes per plain text byte"
+              f"{amount * pt_bytes / elapsed / 1024:10.1f} KiB/s encrypted")
+
+        if dec_list != values:  # Wrong decryptions
+            print(f"{bcolors.RED}Wrong decrypted values{bcolors.END}")
+            return -1
+    return 0
+
+
+def bench_fixed(amount=BENCH_AMOUNT, window_list=None, exp_bits=FIXED_EXP_BITS, key_len=KEY_LEN, table_dir=TABLE_DIR):
+    """
+    Measures enc() with fixed base tables of different windows against enc() with a full exponentiation by n.
+    The tables are also saved and loaded to measure the disk cache, and removed afterwards
+    :param amount: Amount of values encrypted in each run
+    :param window_list: List with the windows of the tables
+    :param exp_bits: Bits of the short random exponents
+    :param key_len: Length of n in bits
+    :param table_dir: Folder where the tables are saved
+    :return:
+    """
+    window_list = BENCH_FIXED_WINDOWS if window_list is None else window_list
+    print_header(f"Fixed base tables of {exp_bits} bit exponents with {amount} values and n of {key_len} bits")
+
+    pk, sk = key_gen(key_len)
+    values = [random.randrange(2 ** 32) for _ in range(amount)]
+
+    start = time.perf_counter()
+    for val in values:
+        enc(val, pk)
+    base_time = time.perf_counter() - start
+    print_row("r^n mod n^2", base_time, amount, "enc")
+
+    for window in window_list:
+        start = time.perf_counter()
+        table = attach_table(pk, None, exp_bits, window)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        enc_list = [enc(val, pk) for val in values]
+        elapsed = time.perf_counter() - start
+        print_row(f"window {window}", elapsed, amount, "enc")
+
+        path = table_path(pk, window, table_dir)
+        save_table(path, pk, table)
+        start = time.perf_counter()
+        load_table(path, pk)
+        load_time = time.perf_counter() - start
+        remove_file(path)
+
+        print(f"{'':<24}{build_time:10.3f} s build{load_time:10.3f} s load{table.size() / 2 ** 20:10.2f} MiB"
+              f"{base_time / elapsed:10.1f}x speedup")
+
+        detach_table(pk)
+        if [dec(val, sk, pk) for val in enc_list] != values:  # Wrong decryptions
+            print(f"{bcolors.RED}Wrong decrypted values{bcolors.END}")
+            return -1
+    return 0
+
+
+def bench_vec(size_list=None, weight_bits=BENCH_VEC_BITS, workers=1, key_len=KEY_LEN):
+    """
+    Measures the sum and the dot product of an encrypted vector against the naive loop of
+    secure_scalar_mult() and secure_addition(). The vectors are encrypted with a fixed base table
+    :param size_list: List with the lengths of the vectors
+    :param weight_bits: Bits of the plain text weights
+    :param workers: Amount of worker processes of the vector. 1 runs everything in this process
+    :param key_len: Length of n in bits
+    :return:
+    """
+    size_list = BENCH_VEC_SIZES if size_list is None else size_list
+    print_header(f"Encrypted vectors with {weight_bits} bit weights and n of {key_len} bits")
+
+    pk, sk = key_gen(key_len)
+    attach_table(pk)  # Only to encrypt the vectors faster
+
+    for size in size_list:
+        values = [random.randrange(2 ** 16) for _ in range(size)]
+        weights = [random.randrange(2 ** weight_bits) for _ in range(size)]
+        vector = enc_vector(values, pk)
+        vector.workers = workers
+
+        start = time.perf_counter()
+        naive = enc(0, pk)
+        for c_i, w_i in zip(vector.ciphertexts, weights):
+            naive = secure_addition(naive, secure_scalar_mult(c_i, w_i, pk), pk)
+        naive_time = time.perf_counter() - start
+        print_row(f"{size} naive dot", naive_time, size, "elem")
+
+        start = time.perf_counter()
+        dot = vector.dot(weights)
+        elapsed = time.perf_counter() - start
+        print_row(f"{size} dot()", elapsed, size, "elem")
+        print(f"{'':<24}{naive_time / elapsed:10.1f}x speedup")
+
+        start = time.perf_counter()
+        naive_sum = enc(0, pk)
+        for c_i in vector.ciphertexts:
+            naive_sum = secure_addition(naive_sum, c_i, pk)
+        print_row(f"{size} naive sum", time.perf_counter() - start, size, "elem")
+
+        start = time.perf_counter()
+        total = vector.sum()
+        print_row(f"{size} sum()", time.perf_counter() - start, size, "elem")
+
+        expected = sum(v * w for v, w in zip(values, weights)) % pk.n
+        if dec(dot, sk, pk) != expected or dec(naive, sk, pk) != expected or dec(total, sk, pk) != sum(values):
+            print(f"{bcolors.RED}Wrong dot product or sum{bcolors.END}")
+            detach_table(pk)
+            return -1
+
+    detach_table(pk)
+    return 0
+
+
+def bench_file(amount=BENCH_CT_AMOUNT, reads=BENCH_CT_READS, key_len=KEY_LEN, ct_dir=CT_DIR):
+    """
+    Measures writing and reading a ciphertext file against keeping the ciphertexts as a list of ints.
+    The ciphertexts are encrypted with a fixed base table
+    :param amount: Amount of ciphertexts
+    :param reads: Amount of ciphertexts read at random indexes
+    :param key_len: Length of n in bits
+    :param ct_dir: Folder where the file is written, it is removed afterwards
+    :return:
+    """
+    print_header(f"Ciphertext file with {amount} ciphertexts and n of {key_len} bits")
+
+    pk, sk = key_gen(key_len)
+    attach_table(pk)  # Only to encrypt the ciphertexts faster
+    values = [random.randrange(2 ** 32) for _ in range(amount)]
+    ciphertexts = [int(enc(val, pk)) for val in values]
+    detach_table(pk)
+
+    heap = sys.getsizeof(ciphertexts) + sum(sys.getsizeof(c_i) for c_i in ciphertexts)
+    path = os.path.join(ct_dir, "bench{}".format(CT_EXT))
+
+    start = time.perf_counter()
+    save_ciphertexts(path, pk, ciphertexts)
+    print_row("save_ciphertexts()", time.perf_counter() - start, amount, "ct")
+
+    start = time.perf_counter()
+    loaded = sum(1 for _ in load_ciphertexts(path, pk))
+    print_row("load_ciphertexts()", time.perf_counter() - start, amount, "ct")
+
+    tracemalloc.start()
+    for _ in load_ciphertexts(path, pk):  # Streaming
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with CiphertextReader(path, pk) as reader:
+        indexes = [random.randrange(amount) for _ in range(reads)]
+        start = time.perf_counter()
+        read = [reader[i] for i in indexes]
+        print_row("random reader[i]", time.perf_counter() - start, reads, "ct")
+
+        wrong = loaded != amount or any(read[j] != ciphertexts[i] for j, i in enumerate(indexes)) or \
+            [dec(c_i, sk, pk) for c_i in reader[:8]] != values[:8]
+
+    print(f"{'':<24}{os.path.getsize(path) / 2 ** 20:10.2f} MiB file{heap / 2 ** 20:10.2f} MiB list of ints"
+          f"{peak / 2 ** 20:10.2f} MiB peak streaming")
+    remove_file(path)
+
+    if wrong:  # Wrong ciphertexts read
+        print(f"{bcolors.RED}Wrong ciphertexts read from the file{bcolors.END}")
+        return -1
+    return 0
@@ -1,14 +1,29 @@
 # Global parameters
 KEY_LEN = 2048  # In bits
 # KEY_LEN = 32  # In bits
-SEC_PARAM = 1010580409767
+SEC_PARAM = 40  # Statistical security parameter. r has l + SEC_PARAM + 1 random bits
+SIEVE_LIMIT = 2000  # Small primes below this bound pre-filter the prime candidates
+SIEVE_WINDOW = 4096  # Amount of consecutive odd candidates sieved at once
+DGK_KEY_LEN = KEY_LEN  # Length of the DGK n in bits
+DGK_T = 160  # Length of v_p and v_q in bits
+DGK_U = 65537  # Plain text space of DGK. It has to be larger than the compared lengths + 2
+POOL_CAPACITY = 256  # Maximum amount of obfuscators precomputed in the background for enc()
+CTX_CACHE = 1024  # Maximum amount of negated ciphertexts cached by a key context
+PACK_HEADROOM = 16  # Extra bits of each packed slot. They allow 2^16 additions of full values
+FIXED_EXP_BITS = 256  # Bits of the short random exponents of the fixed base obfuscators. Twice the security level
+FIXED_WINDOW = 6  # Bits of the exponent covered by each row of a fixed base table
+VEC_CHUNK = 4096  # Elements of an encrypted vector sent to a worker at once
+VEC_STRAUS_MAX = 16  # Vectors up to this length use Straus in the dot products, longer ones Pippenger
+VEC_STRAUS_WINDOW = 4  # Bits of the exponents processed at once by Straus
 
 # Paillier Testing
 TEST_RANGE = 1  # Amount of executions for test-pail
 TEST_MSG = 9589489438
+TEST_ZERO_AMOUNT = 200  # Amount of random full range plain texts checked with is_zero() in test-zero
 TICK = u'\u2713'
 
 # SQP Testing
+TEST_SQP_PAIRS = 10  # Amount of random pairs compared for each length in test-sqp
 # TEST_NUM1 = 1500000000
 # TEST_NUM1 = 1219776944015764000107391119181
 TEST_NUM1 = 600
@@ -28,6 +43,44 @@ TIM_AMOUNT = 100  # Total amount of numbers to be tested
 TIM_PAIRS = TIM_AMOUNT / 2  # Amount of pairs to be tested, based on TIM_AMOUNT
 EXE_REP = 6  # Just one execution per pair of values
 
+# Batch Variables
+BATCH_WORKERS = None  # Amount of worker processes for the batch operations. None uses all the cores
+BATCH_CHUNK = 16  # Amount of values sent to a worker at once
+E_CHUNK = 4  # Amount of e values sent to a worker at once in a parallel comparison
+
+# Benchmark Variables
+BENCH_AMOUNT = 256  # Amount of values used in each benchmark run
+BENCH_SQP_PAIRS = 10  # Amount of pairs compared in the SQP benchmarks
+BENCH_NUMBER_REP = 20  # Times each operation goes through all the pairs in the EncryptedNumber benchmark
+BENCH_BUCKETS = 16  # Amount of public boundaries of the bucketing benchmark
+BENCH_SELECT_SIZES = [16, 256, 1024]  # Amounts of numbers of the selection benchmark
+BENCH_SELECT_LEN = 16  # Length of the numbers of the selection benchmark
+BENCH_TOP_K = 3  # k of the top-k of the selection benchmark
+BENCH_KEY_REP = 5  # Amount of keys generated in the key generation benchmark
+BENCH_DJ_AMOUNT = 32  # Amount of plain texts of the Damgard-Jurik benchmark
+BENCH_DJ_S = [1, 2, 3, 4]  # Values of s of the Damgard-Jurik benchmark
+BENCH_FIXED_WINDOWS = [4, 6, 8]  # Windows of the fixed base tables of the encryption benchmark
+BENCH_VEC_SIZES = [1000, 10000, 100000]  # Lengths of the encrypted vectors of the vector benchmark
+BENCH_VEC_BITS = 32  # Bits of the weights of the vector benchmark
+BENCH_CT_AMOUNT = 100000  # Amount of ciphertexts of the ciphertext file benchmark
+BENCH_CT_READS = 10000  # Amount of random ciphertexts read from the ciphertext file
+
+# Network Variables
+FRAME_LEN_BYTES = 4  # Bytes of the length prefix of a frame
+NET_PIPELINE = 8  # Comparisons in flight at once over one channel
+NET_PAIRS = 20  # Amount of pairs of the network benchmark
+
+# Key Store
+KEY_DIR = "keys/"  # Folder of the key store
+KEY_EXT = ".key"  # Extension of the key files
+BUNDLE_DIR = "keys/bundles/"  # Folder of the precomputed comparison material
+BUNDLE_EXT = ".bundle"  # Extension of the bundle files
+TABLE_DIR = "keys/tables/"  # Folder of the fixed base tables
+TABLE_EXT = ".table"  # Extension of the fixed base table files
+CT_DIR = "keys/ciphertexts/"  # Folder of the ciphertext files
+CT_EXT = ".ct"  # Extension of the ciphertext files
+CT_BATCH = 1024  # Ciphertexts encoded or decoded at once when a ciphertext file is streamed
+
 # Folders
 DATA_F = "data/"
 TIM_10_F = "timing_length_10/"
@@ -36,6 +89,12 @@ TIM_50_F = "timing_length_50/"
 TIM_100_F = "timing_length_100/"
 CREATE_FOLDERS = [DATA_F, TIM_10_F, TIM_20_F, TIM_50_F, TIM_100_F]
 
+# Suffixes of the CSV files for the offline/online timing
+OFFLINE_SUF = "_offline"
+ONLINE_SUF = "_online"
+DGK_SUF = "_dgk"
+EQ_SUF = "_eq"
+
 # CSV Files
 TIM_10_CSV = "timing_length_10.csv"
 TIM_20_CSV = "timing_length_20.csv"
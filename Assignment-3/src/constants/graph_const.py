@@ -71,6 +71,14 @@ GRAPH_COMP_NM = [
     "Bit_length_100"
 ]
 
+# Names for the graph of the comparison against the equality test
+EQ_IMG = "Comparison_vs_equality"
+EQ_GRAPH_NM = "Mean Execution time of the Comparison and the Equality Test"
+EQ_LABEL = [
+    "Secure Comparison Protocol",
+    "Secure Equality Test"
+]
+
 # Size of the points for the graph
 PTN_SIZE = [3,  # For graph with points
               3]  # For discontinuous line graphs
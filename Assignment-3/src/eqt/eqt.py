@@ -0,0 +1,47 @@
+import secrets
+
+from src.paillier.paillier import enc, is_zero, secure_addition, secure_scalar_mult, secure_subst
+
+
+def calc_d(num1, num2, pk):
+    """
+    Calculates the encrypted difference [d] = [a] - [b]
+    :param num1: First encrypted number to be compared
+    :param num2: Second encrypted number to be compared
+    :param pk: Public Key
+    :return: The value [d]
+    """
+    return secure_subst(num1, num2, pk)
+
+
+def blind_d(d, pk):
+    """
+    Blinds the difference multiplicatively: [rho * d] with a random rho in [1, n).
+    A zero stays zero and any other value becomes a random element modulus n.
+    It is re-randomized with a fresh [0] so the ciphertext cannot be linked to [d]
+    :param d: Encrypted difference
+    :param pk: Public Key
+    :return: The blinded difference
+    """
+    rho = secrets.randbelow(pk.n - 1) + 1  # Random rho, invertible with overwhelming probability
+
+    blinded = secure_scalar_mult(d, rho, pk)
+
+    return secure_addition(blinded, enc(0, pk), pk)
+
+
+def eqt(num1, num2, pk, sk):
+    """
+    Performs the Secure Equality Test. It only needs one blinded zero test, not the bitwise
+    part of the comparison
+    :param num1: First encrypted number to be compared
+    :param num2: Second encrypted number to be compared
+    :param pk: Public Key
+    :param sk: Secret Key
+    :return: 1 if both numbers are equal, otherwise 0
+    """
+    # Blinded difference, the only value seen by the key holder
+    d_blind = blind_d(calc_d(num1, num2, pk), pk)
+
+    # Randomized zero test
+    return int(is_zero(d_blind, sk, pk))
@@ -7,7 +7,13 @@ from src.constants.graph_const import *
 from src.constants.const import *
 
 
-def obtain_mean(data_list):
+def obtain_mean(data_list, round_val=2):
+    """
+    Calculates the mean of each column for every data frame
+    :param data_list: List with the data frames
+    :param round_val: It sets the decimal values to round the mean execution time. None does not round it
+    :return: A list with a data frame of the means
+    """
     mean_data = np.array([COL_NM[0], COL_NM[1]])
     for data_f_i in data_list:
         mean_i = np.mean(data_f_i, axis=0)
@@ -18,7 +24,8 @@ def obtain_mean(data_list):
     df = pd.DataFrame(data=mean_data, dtype=float)
 
     df.columns = [COL_NM[0], COL_NM[1]]
-    df[COL_NM[1]] = df[COL_NM[1]].round(decimals=2)
+    if round_val is not None:
+        df[COL_NM[1]] = df[COL_NM[1]].round(decimals=round_val)
     # df[COL_NM[0]] = df[COL_NM[0]].round(decimals=0)
 
     return [df]
@@ -268,6 +275,45 @@ def create_graph():
                    LGN_LR, PTN_SIZE_LGN, PTN_SIZE, LABEL,
                    IMG_FOLDER_PATH, IMG, IMG_TYPE, IMG_SIZE)
 
+    # Comparison against the equality test
+    eq_graph()
+
+
+def eq_graph():
+    """
+    Creates the graph with the mean execution time of the comparison and the equality test
+    for every bit length. It needs the csv files of "timer --eq"
+    """
+    files = [DATA_F + TIM_10_F + TIM_10_CSV,
+             DATA_F + TIM_20_F + TIM_20_CSV,
+             DATA_F + TIM_50_F + TIM_50_CSV,
+             DATA_F + TIM_100_F + TIM_100_CSV]
+
+    # Equality test files, with the suffix before the extension
+    eq_files = [os.path.splitext(file)[0] + EQ_SUF + os.path.splitext(file)[1] for file in files]
+
+    # Nothing to compare with
+    if not all(os.path.isfile(file) for file in eq_files):
+        return
+
+    create_folder(IMG_FOLDER_PATH + LN_DISC_F)
+
+    # Mean execution time for each length of both protocols. Not rounded, as the equality test takes a few ms
+    # and a rounded 0.0 would be dropped by the log scale
+    for data, label, colour in [(obtain_mean(readFiles(files, COL_NM), None)[0], EQ_LABEL[0], COLOUR[0]),
+                                (obtain_mean(readFiles(eq_files, COL_NM), None)[0], EQ_LABEL[1], COLOUR[1])]:
+        plt.plot(data[COL_NM[0]], data[COL_NM[1]], label=label, marker='.', color=colour, linestyle=':')
+
+    plt.title(EQ_GRAPH_NM)
+    plt.xlabel(AXIS_NM[0])
+    plt.ylabel(AXIS_NM[1])
+    plt.yscale("log")  # The equality test is orders of magnitude faster
+    plt.grid(True, color=GRID_COLOUR, linestyle=GRID_DISC)
+    plt.legend(loc="center right", fontsize=10)
+
+    plt.savefig(IMG_FOLDER_PATH + LN_DISC_F + EQ_IMG + IMG_TYPE, dpi=IMG_SIZE)
+    plt.close()
+
 
 def createPlots(c1, c2, data, label, colour,
                 x_axis, y_axis, point_size, name, axis,
@@ -0,0 +1,101 @@
+try:
+    import gmpy2
+except ImportError:  # gmpy2 is optional. The pure Python arithmetic is used without it
+    gmpy2 = None
+
+# Names of the arithmetic backends
+AUTO = "auto"
+GMPY2 = "gmpy2"
+PYTHON = "python"
+BACKENDS = [AUTO, GMPY2, PYTHON]
+
+name = None  # Active backend. It is set by set_backend()
+
+
+def set_backend(backend=AUTO):
+    """
+    Selects the big integer arithmetic used by the cryptosystems
+    :param backend: "gmpy2", "python" or "auto" to use gmpy2 when it can be imported
+    :return: The name of the active backend
+    """
+    global name
+
+    if backend == AUTO:  # Prefer gmpy2 when it is installed
+        backend = GMPY2 if gmpy2 is not None else PYTHON
+
+    if backend == GMPY2 and gmpy2 is None:
+        raise ValueError("gmpy2 backend selected but gmpy2 is not installed")
+
+    if backend not in BACKENDS:
+        raise ValueError("Unknown arithmetic backend: {}".format(backend))
+
+    name = backend
+    return name
+
+
+def is_gmpy2():
+    """
+    Checks if gmpy2 is the active backend
+    :return: True if gmpy2 is used
+    """
+    return name == GMPY2
+
+
+def powmod(x, y, m):
+    """
+    Calculates x^y mod m
+    :param x: Base
+    :param y: Exponent
+    :param m: Modulus
+    :return: x^y mod m
+    """
+    if name == GMPY2:
+        return gmpy2.powmod(x, y, m)
+
+    return pow(x, y, m)
+
+
+def mulmod(x, y, m):
+    """
+    Calculates x * y mod m
+    :param x: First factor
+    :param y: Second factor
+    :param m: Modulus
+    :return: x * y mod m
+    """
+    if name == GMPY2:
+        return gmpy2.mpz(x) * y % m
+
+    return x * y % m
+
+
+def invert(x, m):
+    """
+    Calculates the multiplicative inverse of x mod m
+    :param x: Number to invert
+    :param m: Modulus
+    :return: The inverse of x mod m, None if it does not exist
+    """
+    if name == GMPY2:
+        try:
+            return gmpy2.invert(x, m)
+        except ZeroDivisionError:  # No multiplicative inverse exists
+            return None
+
+    try:
+        return pow(x, -1, m)
+    except ValueError:  # No multiplicative inverse exists
+        return None
+
+
+def is_prime(x, t):
+    """
+    Checks if a number is prime with the Miller-Rabin test of gmpy2
+    :param x: Number to be checked
+    :param t: Amount of rounds
+    :return: True if it is prime. Otherwise False is returned
+    """
+    return gmpy2.is_prime(x, t)
+
+
+set_backend(AUTO)  # Default backend
@@ -0,0 +1,242 @@
+import secrets
+
+from src.constants.const import DGK_KEY_LEN, DGK_T, DGK_U
+from src.paillier import backend
+from src.paillier.dgk_key import *
+from src.paillier.paillier import get_prime, is_prime, calc_mr_rounds, mult_inv, batch_inv, calc_r_list, dec
+from src.sqp.sqp_stats import sqp_stats
+
+
+def get_dgk_prime(factor, p_len):
+    """
+    Creates a random prime number p with p_len bits such that "factor" divides p - 1
+    :param factor: Factor of p - 1
+    :param p_len: The length of the prime number in bits
+    :return: The prime number
+    """
+    rounds = calc_mr_rounds(p_len)
+    r_len = p_len - factor.bit_length() - 1  # Bits left for the random part
+
+    while True:
+        # p = 2 * factor * r + 1
+        p_num = 2 * factor * (secrets.randbits(r_len) | (1 << (r_len - 1))) + 1
+
+        if p_num.bit_length() == p_len and is_prime(p_num, rounds):
+            return p_num
+
+
+def get_generator(p_num, orders):
+    """
+    Finds an element modulus p whose order is the product of the prime numbers in "orders"
+    :param p_num: Prime modulus
+    :param orders: List of prime numbers dividing p - 1
+    :return: The element found
+    """
+    order = 1
+    for o_i in orders:
+        order *= o_i
+
+    while True:
+        x = secrets.randbelow(p_num - 2) + 2
+        gen = pow(x, (p_num - 1) // order, p_num)  # Its order divides "order"
+
+        # The order is exactly "order" if no prime factor can be removed
+        if all(pow(gen, order // o_i, p_num) != 1 for o_i in orders):
+            return gen
+
+
+def crt(a_p, a_q, p_num, q_num, q_inv):
+    """
+    Joins the values modulus p and q into the value modulus p * q
+    :param a_p: Value modulus p
+    :param a_q: Value modulus q
+    :param p_num: First prime
+    :param q_num: Second prime
+    :param q_inv: q^-1 mod p
+    :return: The value modulus p * q
+    """
+    return a_q + (a_p - a_q) * q_inv % p_num * q_num
+
+
+def dgk_key_gen(key_len=DGK_KEY_LEN, t=DGK_T, u=DGK_U):
+    """
+    Creates the keys for the DGK Cryptosystem
+    :param key_len: Length of n in bits
+    :param t: Length of v_p and v_q in bits
+    :param u: Prime size of the plain text space
+    :return: The public and private keys obtained
+    """
+    v_p, v_q = get_prime(t), get_prime(t)
+    while v_q == v_p:
+        v_q = get_prime(t)
+
+    # u * v_p divides p - 1 and u * v_q divides q - 1
+    p = get_dgk_prime(u * v_p, key_len // 2)
+    q = get_dgk_prime(u * v_q, key_len // 2)
+    n = p * q
+    q_inv = mult_inv(q, p)
+
+    # g has order u * v_p * v_q and h has order v_p * v_q
+    g = crt(get_generator(p, [u, v_p]), get_generator(q, [u, v_q]), p, q, q_inv)
+    h = crt(get_generator(p, [v_p]), get_generator(q, [v_q]), p, q, q_inv)
+
+    return DgkPublicKey(n, g, h, u, t), DgkPrivateKey(p, q, v_p, v_q)
+
+
+def dgk_enc(msg, pk):
+    """
+    Encrypts a message "msg" with the DGK public key "pk": g^m * h^r mod n
+    The random exponent r only has 2.5 * t bits
+    :param msg: Message to be encrypted, modulus u
+    :param pk: DGK Public Key
+    :return: The encrypted value
+    """
+    rdn = secrets.randbits(int(2.5 * pk.t))
+
+    g_m = backend.powmod(pk.g, msg % pk.u, pk.n)
+    h_r = backend.powmod(pk.h, rdn, pk.n)
+
+    return backend.mulmod(g_m, h_r, pk.n)
+
+
+def dgk_is_zero(enc_msg, sk):
+    """
+    Checks if a message "enc_msg" is an encryption of zero: c^v_p = 1 mod p if and only if m = 0
+    :param enc_msg: Encrypted message
+    :param sk: DGK Secret Key
+    :return: True if it is an encryption of zero
+    """
+    return backend.powmod(enc_msg, sk.v_p, sk.p) == 1
+
+
+def dgk_dec(enc_msg, sk, pk):
+    """
+    Decrypts a message "enc_msg" with a lookup table of (g^v_p)^m mod p.
+    The table is built the first time, so only small plain text spaces are practical
+    :param enc_msg: Encrypted message
+    :param sk: DGK Secret Key
+    :param pk: DGK Public Key
+    :return: The decrypted message
+    """
+    if sk.dec_table is None:  # Build the table
+        g_vp = pow(pk.g, sk.v_p, sk.p)
+        sk.dec_table = {}
+        val = 1
+        for m in range(pk.u):
+            sk.dec_table[val] = m
+            val = val * g_vp % sk.p
+
+    return sk.dec_table[int(backend.powmod(enc_msg, sk.v_p, sk.p))]
+
+
+def dgk_addition(m1, m2, pk):
+    """
+    Performs a secure addition of two DGK ciphertexts
+    :param m1: First encrypted message
+    :param m2: Second encrypted message
+    :param pk: DGK Public Key
+    :return: The addition performed
+    """
+    return backend.mulmod(m1, m2, pk.n)
+
+
+def dgk_scalar_mult(m1, c, pk):
+    """
+    Performs a secure scalar multiplication of a DGK ciphertext
+    :param m1: Encrypted message
+    :param c: Scalar variable to be used in the multiplication
+    :param pk: DGK Public Key
+    :return: The scalar multiplication performed
+    """
+    return backend.powmod(m1, c, pk.n)
+
+
+def blind_e_dgk(e_i, pk):
+    """
+    Blinds a DGK e value: [e_i * s_i] = [e_i]^s_i with a random s_i from 1 to u - 1.
+    u is prime, so a zero stays zero and any other value becomes a random nonzero one, which hides the bits of r
+    :param e_i: Encrypted e value
+    :param pk: DGK Public Key
+    :return: The blinded e value
+    """
+    return dgk_scalar_mult(e_i, secrets.randbelow(pk.u - 1) + 1, pk)
+
+
+def calc_c_list_dgk(c, sk, pk, msg_len, two_to_l, dgk_pk):
+    """
+    Calculates the DGK encryption of all the bits of c
+    :param c: Value c, encrypted with Paillier
+    :param sk: Paillier Secret Key
+    :param pk: Paillier Public Key
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param dgk_pk: DGK Public Key
+    :return: A list with all the bits of c encrypted, the least significant first
+    """
+    dec_c = dec(c, sk, pk) % two_to_l  # Decrypt c and reduce it to mod 2^l
+
+    return [dgk_enc((dec_c >> i) & 1, dgk_pk) for i in range(msg_len)]
+
+
+def gen_e_list_dgk(r, c_encrypt, msg_len, two_to_l, dgk_pk):
+    """
+    Generates the e values under DGK one by one in a random order, each one blinded with a random nonzero factor.
+    e_i = [1] + [c_i] - [r_i] + sum_{j > i} [c_j XOR r_j]
+    :param r: Value r
+    :param c_encrypt: List with the bits of c encrypted with DGK
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param dgk_pk: DGK Public Key
+    :return: A generator of the e values
+    """
+    r_list = calc_r_list(r, msg_len, two_to_l)
+
+    # Encode 1, 0 and the bits of r to operate with them
+    enc_1 = dgk_enc(1, dgk_pk)
+    enc_0 = dgk_enc(0, dgk_pk)
+    r_encoded = [dgk_enc(r_i, dgk_pk) for r_i in r_list]
+
+    # subs_j = [c_j] * r_j
+    subs_list = [dgk_scalar_mult(c_j, r_list[j], dgk_pk) for j, c_j in enumerate(c_encrypt)]
+
+    # Negate all the subtracted values at once: [-r_i] and [-c_j * r_j]
+    neg_list = batch_inv(r_encoded + subs_list, dgk_pk.n)
+    r_neg = neg_list[:len(r_encoded)]
+    subs_neg = neg_list[len(r_encoded):]
+
+    # Suffix sums [0] + sum_{j > i} xor_j in a single backward pass
+    sum_list = [None] * len(c_encrypt)
+    sum_op = enc_0
+    for i in range(len(c_encrypt) - 1, -1, -1):
+        sum_list[i] = sum_op
+
+        # xor_i = [c_i] + [r_i] - [c_i] * r_i - [c_i] * r_i
+        xor_i = dgk_addition(dgk_addition(c_encrypt[i], r_encoded[i], dgk_pk),
+                             dgk_addition(subs_neg[i], subs_neg[i], dgk_pk), dgk_pk)
+        sum_op = dgk_addition(sum_op, xor_i, dgk_pk)
+
+    order = list(range(len(c_encrypt)))
+    secrets.SystemRandom().shuffle(order)  # Random order of the e values
+
+    for i in order:
+        sqp_stats.e_computed += 1
+
+        # e_i = [1] + [c_i] - [r_i] + sum_{j > i} xor_j
+        left_add = dgk_addition(dgk_addition(enc_1, c_encrypt[i], dgk_pk), r_neg[i], dgk_pk)
+        yield blind_e_dgk(dgk_addition(left_add, sum_list[i], dgk_pk), dgk_pk)  # Only its zero test is revealed
+
+
+def check_e_dgk(e_list, dgk_sk):
+    """
+    Checks if any of the DGK e values is an encryption of zero. It stops at the first zero
+    :param e_list: List or generator of e values
+    :param dgk_sk: DGK Secret Key
+    :return: 1 if there is a zero, otherwise 0
+    """
+    for e_enc in e_list:
+        sqp_stats.e_decrypted += 1
+
+        if dgk_is_zero(e_enc, dgk_sk):  # r larger than c
+            return 1
+
+    return 0
@@ -0,0 +1,28 @@
+class DgkPublicKey:
+    __slots__ = ("n", "g", "h", "u", "t")
+
+    def __init__(self, n, g, h, u, t):
+        self.n = n
+        self.g = g  # Generator of order u * v_p * v_q
+        self.h = h  # Generator of order v_p * v_q
+        self.u = u  # Size of the plain text space
+        self.t = t  # Bit length of v_p and v_q
+
+    def toString(self):
+        print("DGK Public Key:\n n: {}\n g: {}\n h: {}\n u: {}"
+              .format(self.n, self.g, self.h, self.u))
+
+
+class DgkPrivateKey:
+    __slots__ = ("p", "q", "v_p", "v_q", "dec_table")
+
+    def __init__(self, p, q, v_p, v_q):
+        self.p = p
+        self.q = q
+        self.v_p = v_p
+        self.v_q = v_q
+        self.dec_table = None  # (g^v_p)^m mod p -> m. It is only built for the full decryption
+
+    def toString(self):
+        print("DGK Private Key:\n p: {}\n q: {}\n v_p: {}\n v_q: {}"
+              .format(self.p, self.q, self.v_p, self.v_q))
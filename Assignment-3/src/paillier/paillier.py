@@ -1,8 +1,16 @@
-from src.constants.const import KEY_LEN, SEC_PARAM
+from src.constants.const import KEY_LEN, SEC_PARAM, SIEVE_LIMIT, SIEVE_WINDOW
+from src.paillier import backend
 from src.paillier.paillier_key import *
+from src.paillier.paillier_material import SqpMaterial
+from src.paillier.paillier_number import EncryptedNumber, get_context, calc_n_plus_m
+from src.paillier.paillier_pool import get_obfuscator
+from src.sqp.sqp_stats import sqp_stats
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from decimal import *
 
 import random
+from math import factorial
 import secrets
 
 
@@ -46,6 +54,18 @@ def calc_mu(lamb, n):
     return mult_inv(lamb, n)
 
 
+def calc_h(g, p_num):
+    """
+    Calculates the CRT constant h used to decrypt modulus p^2
+    h = L_p(g^(p-1) mod p^2)^-1 mod p
+    :param g: Generator "g" from the Public Key
+    :param p_num: Prime factor of n
+    :return: The constant h for the prime p_num
+    """
+    p_2 = p_num * p_num
+    return mult_inv(calc_l(backend.powmod(g, p_num - 1, p_2), p_num), p_num)
+
+
 def e_gcd(a, b):
     """
     Extended euclidean implementation to calculate the gcd
@@ -60,9 +80,102 @@ def e_gcd(a, b):
         return g, x - (b // a) * y, y
 
 
+def calc_small_primes(limit):
+    """
+    Calculates all the prime numbers below "limit" with the sieve of Eratosthenes
+    :param limit: Upper bound of the primes
+    :return: A list with the primes found
+    """
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"  # 0 and 1 are not prime
+
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:  # Remove all the multiples of the prime i
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+
+    return [i for i, is_p in enumerate(sieve) if is_p]
+
+
+SMALL_PRIMES = calc_small_primes(SIEVE_LIMIT)  # Primes used to pre-filter the candidates
+
+
+def calc_mr_rounds(p_len):
+    """
+    Calculates the amount of Miller-Rabin rounds needed for a random candidate of p_len bits.
+    Larger candidates need less rounds for the same error probability (BN_prime_checks_for_size from OpenSSL)
+    :param p_len: The length of the candidate in bits
+    :return: The amount of rounds
+    """
+    if p_len >= 3747:
+        return 3
+    if p_len >= 1345:
+        return 4
+    if p_len >= 476:
+        return 5
+    if p_len >= 400:
+        return 6
+    if p_len >= 347:
+        return 7
+    if p_len >= 308:
+        return 8
+    if p_len >= 55:
+        return 27
+    return 34
+
+
+def sieve_window(start, size):
+    """
+    Sieves the odd candidates start, start + 2, ..., start + 2 * (size - 1) with the small primes
+    :param start: First candidate. It has to be odd and larger than the small primes
+    :param size: Amount of candidates
+    :return: A bytearray where 1 means that the candidate has no small factor
+    """
+    flags = bytearray([1]) * size
+
+    for s_prime in SMALL_PRIMES[1:]:  # 2 is skipped as all the candidates are odd
+        # Index of the first candidate multiple of s_prime: start + 2 * i = 0 mod s_prime
+        i = -start * ((s_prime + 1) // 2) % s_prime
+        flags[i::s_prime] = bytes(len(range(i, size, s_prime)))
+
+    return flags
+
+
 def get_prime(p_len):
     """
-    Creates a random prime number with p_len bits
+    Creates a random prime number with p_len bits.
+    The search starts from a random odd number and goes through the next odd numbers,
+    discarding the ones with small factors before running the Miller-Rabin test
+    :param p_len: The length of the prime numbers in bits
+    :return: The random prime number
+    """
+    p_len = int(p_len)
+
+    # Small lengths can collide with the sieve primes - Use the random search
+    if 2 ** (p_len - 1) <= SIEVE_LIMIT:
+        return get_prime_random(p_len)
+
+    rounds = calc_mr_rounds(p_len)
+    upper_bound = 2 ** p_len
+
+    while True:
+        # Random odd start with the top bit set
+        start = secrets.randbits(p_len) | (1 << (p_len - 1)) | 1
+
+        # Go through the window of candidates
+        for i, no_factor in enumerate(sieve_window(start, SIEVE_WINDOW)):
+            p_num = start + 2 * i
+
+            if p_num >= upper_bound:  # Out of range - Start again from a new random number
+                break
+
+            if no_factor and is_prime(p_num, rounds):
+                return p_num  # Return obtained prime number
+
+
+def get_prime_random(p_len):
+    """
+    Creates a random prime number with p_len bits by drawing random candidates until one passes 128 Miller-Rabin
+    rounds. It is the original prime generation, kept for the small lengths and as reference for benchmarking
     :param p_len: The length of the prime numbers in bits
     :return: The random prime number
     """
@@ -86,6 +199,26 @@ def get_prime(p_len):
     return p_num  # Return obtained prime number
 
 
+def get_prime_pair(p_len, parallel=True):
+    """
+    Creates two random prime numbers with p_len bits
+    :param p_len: The length of the prime numbers in bits
+    :param parallel: Search both primes at the same time in separate processes.
+    The search falls back to this process if the processes cannot be started
+    :return: The two prime numbers
+    """
+    if parallel:
+        try:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                p_fut = executor.submit(get_prime, p_len)
+                q_fut = executor.submit(get_prime, p_len)
+                return p_fut.result(), q_fut.result()
+        except BrokenProcessPool:  # The workers died, for example when the caller cannot be imported again
+            pass
+
+    return get_prime(p_len), get_prime(p_len)
+
+
 def is_prime(n, t=128):
     """
     Check if a number is prime or not
@@ -93,6 +226,9 @@ def is_prime(n, t=128):
     :param t: Maximum amount of tries for checking
     :return: True if it is prime. Otherwise False is returned
     """
+    if backend.is_gmpy2():  # Use the Miller-Rabin test from gmpy2
+        return backend.is_prime(n, t)
+
     # Base cases
     if n == 2 or n == 3:
         return True
@@ -134,6 +270,10 @@ def mult_inv(num, n):
     :param n: Modulus
     :return: The multiplicative inverse of num mod n
     """
+    if backend.is_gmpy2():  # Use the inversion from gmpy2
+        inv = backend.invert(num, n)
+        return int(inv) if inv is not None else None
+
     g, x, y = e_gcd(num, n)
     if g != 1:
         return None  # No multiplicative inverse exists
@@ -141,17 +281,19 @@ def mult_inv(num, n):
         return x % n  # Multiplicative inverse obtained
 
 
-def key_gen():
+def key_gen(key_len=KEY_LEN, parallel=True, s=1):
     """
     Creates the keys for the Paillier Cryptosystem
+    :param key_len: Length of n in bits
+    :param parallel: Search the two prime numbers at the same time in separate processes
+    :param s: Damgard-Jurik exponent. The plain texts are modulus n^s and the ciphertexts modulus n^(s+1)
     :return: The public and private keys obtained
     """
     n, lamb, g, p, q, mu = 0, 0, 0, 0, 0, None  # Initialize values for using the while loop
 
     while mu is None:  # To ensure that mu have a correct value
         while p == q or mu is None:  # To avoid to get the two prime numbers equal
-            p = get_prime(KEY_LEN / 2)  # Each prime number has the half of the key's bit length
-            q = get_prime(KEY_LEN / 2)
+            p, q = get_prime_pair(key_len // 2, parallel)  # Each prime number has the half of the key's bit length
             mu = -1  # To avoid infinite loop
 
         lamb = calc_lambda(p, q)  # Calculate lambda
@@ -160,27 +302,50 @@ def key_gen():
 
         g = calc_g(n)  # Calculate g
 
-        mu = calc_mu(lamb, n)  # Calculate mu
+        mu = calc_mu(lamb, n ** s)  # Calculate mu
+
+    q_inv = mult_inv(q, p)
+
+    if s > 1:  # The CRT decryption is only for Paillier
+        return PublicKey(n, g, s), PrivateKey(lamb, mu, p, q, None, None, q_inv)
+
+    # Precompute the constants used by the CRT decryption
+    hp = calc_h(g, p)
+    hq = calc_h(g, q)
+
+    return PublicKey(n, g), PrivateKey(lamb, mu, p, q, hp, hq, q_inv)
+
+
+def calc_g_m(msg, pk):
+    """
+    Calculates g^msg mod n^(s+1).
+    When g = n + 1 the binomial theorem gives the closed form (1 + msg * n) mod n^2, avoiding the exponentiation.
+    For Damgard-Jurik it has s + 1 terms
+    :param msg: Message to be encrypted
+    :param pk: Public Key
+    :return: g^msg mod n^(s+1)
+    """
+    if pk.g == pk.n + 1:  # Fast path for the generator returned by calc_g()
+        return calc_n_plus_m(msg, pk.n, pk.s, pk.n_s, pk.n_2)
 
-    return PublicKey(n, g), PrivateKey(lamb, mu)
+    return backend.powmod(pk.g, msg, pk.n_2)  # Generic generator
 
 
-def enc(msg, pk):
+def enc(msg, pk, r_n=None):
     """
     Encrypts a message "msg" with the public key "pk"
     :param msg: Message to be encrypted
     :param pk: Public key to be used in the encryption
+    :param r_n: Precomputed obfuscator r^n mod n^2. A new one is used if it is not set
     :return: The encrypted value
     """
-    # Get a random value from 0 to n
-    rdn = secrets.randbelow(pk.n)
-
     # Calculate the exponential values
-    g_m = pow(pk.g, msg, pk.n_2)
-    r_n = pow(rdn, pk.n, pk.n_2)
+    g_m = calc_g_m(msg, pk)
+    if r_n is None:
+        r_n = get_obfuscator(pk)  # r^n mod n^2. Taken from the obfuscator pool of the key if it has one
 
     # Calculate the final value
-    enc_msg = g_m * r_n % pk.n_2
+    enc_msg = backend.mulmod(g_m, r_n, pk.n_2)
 
     return enc_msg  # Return the message encrypted
 
@@ -194,8 +359,18 @@ def dec(enc_msg, sk, pk):
     :param pk: Public Key
     :return: The decrypted message
     """
+    if isinstance(enc_msg, EncryptedNumber):  # Get the bare ciphertext
+        enc_msg = enc_msg.ciphertext
+
+    # Use the faster CRT decryption when the prime factors are known
+    if sk.has_crt():
+        return dec_crt(enc_msg, sk)
+
     # Calculate the x value from L(x)
-    x = pow(enc_msg, sk.lamb, pk.n_2)
+    x = backend.powmod(enc_msg, sk.lamb, pk.n_2)
+
+    if pk.s > 1:  # Damgard-Jurik: x = (1 + n)^(lambda * m)
+        return int(calc_dj_log(x, pk.n, pk.s) * sk.mu % pk.n_s)
 
     # Calculate3 L(x)
     l_result = calc_l(x, pk.n)
@@ -203,7 +378,103 @@ def dec(enc_msg, sk, pk):
     # Calculate the final formula to get the decrypted message
     dec_msg = l_result * sk.mu % pk.n
 
-    return dec_msg
+    return int(dec_msg)
+
+
+def calc_dj_log(x, n, s):
+    """
+    Obtains i from x = (1 + n)^i mod n^(s+1), with the recursive algorithm of Damgard-Jurik.
+    Each step j obtains i mod n^j from L(x mod n^(j+1)) and the value of the step before
+    :param x: Power of 1 + n
+    :param n: Modulus n from the Public Key
+    :param s: Damgard-Jurik exponent
+    :return: i mod n^s
+    """
+    i = 0
+    for j in range(1, s + 1):
+        n_j = n ** j
+        t_1 = calc_l(x % (n_j * n), n)
+        t_2 = i
+
+        for k in range(2, j + 1):
+            i -= 1
+            t_2 = t_2 * i % n_j
+            # t_1 = t_1 - t_2 * n^(k-1) / k!
+            t_1 = (t_1 - t_2 * n ** (k - 1) * mult_inv(factorial(k), n_j)) % n_j
+
+        i = t_1
+
+    return i
+
+
+def dec_crt(enc_msg, sk):
+    """
+    Decrypts a message "enc_msg" using the Chinese Remainder Theorem.
+    The decryption is done modulus p^2 and q^2 separately, which is much cheaper than working modulus n^2
+    :param enc_msg: Encrypted message
+    :param sk: Secret Key with the prime factors and the CRT constants set
+    :return: The decrypted message
+    """
+    # m_p = L_p(c^(p-1) mod p^2) * hp mod p
+    m_p = calc_l(backend.powmod(enc_msg, sk.p - 1, sk.p_2), sk.p) * sk.hp % sk.p
+
+    # m_q = L_q(c^(q-1) mod q^2) * hq mod q
+    m_q = calc_l(backend.powmod(enc_msg, sk.q - 1, sk.q_2), sk.q) * sk.hq % sk.q
+
+    # Join both results: m = m_q + ((m_p - m_q) * q^-1 mod p) * q
+    return int(m_q + (m_p - m_q) * sk.q_inv % sk.p * sk.q)
+
+
+def is_zero(enc_msg, sk, pk):
+    """
+    Checks if a message "enc_msg" is an encryption of zero.
+    With the prime factors of n only one exponentiation modulus p^2 is needed:
+    c^(p-1) = 1 mod p^2 if and only if m = 0 mod p, which is m = 0 for any plain text 0 <= m < p
+    :param enc_msg: Encrypted message
+    :param sk: Secret Key
+    :param pk: Public Key
+    :return: True if it is an encryption of zero
+    """
+    if isinstance(enc_msg, EncryptedNumber):  # Get the bare ciphertext
+        enc_msg = enc_msg.ciphertext
+
+    if sk.p is None:  # No prime factors - Full decryption
+        return dec(enc_msg, sk, pk) == 0
+
+    return backend.powmod(enc_msg, sk.p - 1, sk.p_2) == 1
+
+
+def enc_number(msg, pk):
+    """
+    Encrypts a message "msg" with the public key "pk" into an EncryptedNumber
+    :param msg: Message to be encrypted
+    :param pk: Public key to be used in the encryption
+    :return: The encrypted number
+    """
+    return EncryptedNumber(get_context(pk), enc(msg, pk))
+
+
+def as_number(m, pk):
+    """
+    Wraps a bare ciphertext into an EncryptedNumber
+    :param m: Ciphertext or EncryptedNumber
+    :param pk: Public Key
+    :return: The EncryptedNumber
+    """
+    if isinstance(m, EncryptedNumber):
+        return m
+
+    return EncryptedNumber(get_context(pk), m)
+
+
+def is_number(m1, m2):
+    """
+    Checks if any of the operands is an EncryptedNumber
+    :param m1: First operand
+    :param m2: Second operand
+    :return: True if any of them is an EncryptedNumber
+    """
+    return isinstance(m1, EncryptedNumber) or isinstance(m2, EncryptedNumber)
 
 
 def secure_addition(m1, m2, pk, n=None):
@@ -218,7 +489,10 @@ def secure_addition(m1, m2, pk, n=None):
     if n is not None:  # No pk used, just modulus
         return (m1 % n) * (m2 % n)
 
-    return (m1 % pk.n_2) * (m2 % pk.n_2)  # pk used
+    if is_number(m1, m2):  # Encrypted numbers used
+        return as_number(m1, pk) + as_number(m2, pk)
+
+    return backend.mulmod(m1, m2, pk.n_2)  # pk used
 
 
 def secure_scalar_mult(m1, c, pk, n=None):
@@ -231,9 +505,12 @@ def secure_scalar_mult(m1, c, pk, n=None):
     :return: The scalar multiplication performed
     """
     if n is not None:  # No pk used, just modulus
-        return int(pow(m1, c, n * n))
+        return int(backend.powmod(m1, c, n * n))
 
-    return int(pow(m1, c, pk.n_2))  # pk used
+    if isinstance(m1, EncryptedNumber):  # Encrypted number used
+        return m1 * c
+
+    return int(backend.powmod(m1, c, pk.n_2))  # pk used
 
 
 def secure_subst(m1, m2, pk, n=None):
@@ -246,12 +523,73 @@ def secure_subst(m1, m2, pk, n=None):
     :return: The subtraction performed
     """
     if n is not None:  # No pk used, just modulus
-        m2_aux = int(pow(m2, n - 1, n * n))
-        return (m1 * m2_aux) % (n * n)
+        m2_aux = int(backend.powmod(m2, n - 1, n * n))
+        return backend.mulmod(m1, m2_aux, n * n)
+
+    elif is_number(m1, m2):  # Encrypted numbers used
+        return as_number(m1, pk) - as_number(m2, pk)
 
     else:  # PK used
-        m2_aux = int(pow(m2, pk.n - 1, pk.n_2))
-        return (m1 % pk.n_2) * (m2_aux % pk.n_2)
+        return backend.mulmod(m1, secure_neg(m2, pk), pk.n_2)
+
+
+def secure_neg(m, pk):
+    """
+    Performs a Secure Negation: [m] -> [-m]
+    The modular inverse of the ciphertext is used, which is much cheaper than [m]^(n - 1)
+    :param m: Encrypted message
+    :param pk: Public Key
+    :return: The negation performed
+    """
+    if isinstance(m, EncryptedNumber):  # Encrypted number used
+        return -m
+
+    neg_m = backend.invert(m, pk.n_2)
+    if neg_m is None:
+        raise ValueError("Ciphertext not invertible modulus n^2")
+
+    return neg_m
+
+
+def batch_inv(values, mod):
+    """
+    Calculates the multiplicative inverses of a list of values with the Montgomery's trick:
+    a single inversion plus 3(k - 1) multiplications
+    :param values: List of values to be inverted
+    :param mod: Modulus
+    :return: A list with the inverses in the same order as the input
+    """
+    if not values:
+        return []
+
+    # prefix[i] = values[0] * ... * values[i]
+    prefix = [values[0]]
+    for val in values[1:]:
+        prefix.append(backend.mulmod(prefix[-1], val, mod))
+
+    # Invert the product of all the values
+    inv = backend.invert(prefix[-1], mod)
+    if inv is None:
+        raise ValueError("Value not invertible in the batch inversion")
+
+    # Peel off the values from the last one
+    inv_list = [None] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inv_list[i] = backend.mulmod(inv, prefix[i - 1], mod)  # 1 / values[i]
+        inv = backend.mulmod(inv, values[i], mod)  # 1 / (values[0] * ... * values[i - 1])
+    inv_list[0] = inv
+
+    return inv_list
+
+
+def secure_neg_many(m_list, pk):
+    """
+    Performs the Secure Negation of a list of encrypted messages with a single inversion
+    :param m_list: List of encrypted messages
+    :param pk: Public Key
+    :return: A list with the negations in the same order as the input
+    """
+    return batch_inv(m_list, pk.n_2)
 
 
 def num_to_bin(num):
@@ -274,17 +612,89 @@ def fill_left_zeros(b_num, amount):
     return "0" * amount + str(b_num)  # Append the zeros to the left
 
 
-def calc_z(num1, num2, pk, two_to_l):
+def calc_r(msg_len, sec_param=SEC_PARAM):
+    """
+    Calculates the random value r, of l + sec_param + 1 bits so it statistically hides z
+    :param msg_len: Length of the original message
+    :param sec_param: Security Parameter in bits
+    :return: The value r
+    """
+    return secrets.randbits(sec_param + msg_len + 1)
+
+
+def calc_r_list(r, msg_len, two_to_l):
+    """
+    Calculates the bits of r mod 2^l
+    :param r: Value r
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :return: A list with the bits, the least significant first
+    """
+    # Calculate r modulus 2^l
+    r_mod = r % two_to_l
+
+    # Set r in modulus 2^l to binary
+    r_bin = num_to_bin(r_mod)
+
+    # Check that r has all the bit digits
+    r_filled = fill_left_zeros(r_bin, msg_len - len(str(r_bin)))
+
+    # r_filled as a list
+    r_list = [int(x) for x in str(r_filled)]
+
+    # Reverse the list of r in order to match the logical model of the slides
+    return r_list[::-1]
+
+
+def calc_shared(pk, msg_len):
+    """
+    Encrypts the public constants of the Secure Comparison Protocol. Only these values can be shared by many
+    comparisons, as every other value of the material is blinded by the random r of one comparison
+    :param pk: Public Key
+    :param msg_len: Length of the original message
+    :return: [2^l], [1] and [0]
+    """
+    return enc(2 ** msg_len, pk), enc(1, pk), enc(0, pk)
+
+
+def calc_material(pk, msg_len, shared=None):
+    """
+    Calculates the values of the Secure Comparison Protocol that do not depend on the compared numbers.
+    The material can only be used by one comparison
+    :param pk: Public Key
+    :param msg_len: Length of the original message
+    :param shared: Public constants from calc_shared(). They are encrypted if they are not set
+    :return: The material for the comparison
+    """
+    two_to_l = 2 ** msg_len
+    length_enc, enc_1, enc_0 = calc_shared(pk, msg_len) if shared is None else shared
+
+    r = calc_r(msg_len)
+    r_list = calc_r_list(r, msg_len, two_to_l)
+
+    # Encode r and its bits to operate with them
+    r_encoded = [enc(r_i, pk) for r_i in r_list]
+    r_neg = secure_neg_many(r_encoded, pk)
+
+    # Encryptions of 0 and 1 for each bit of c
+    bit_enc = [[enc(0, pk) for _ in range(msg_len)], [enc(1, pk) for _ in range(msg_len)]]
+
+    return SqpMaterial(msg_len, r, r_list, length_enc, enc(r, pk), enc_1, enc_0, r_encoded, r_neg, bit_enc,
+                       get_obfuscator(pk))
+
+
+def calc_z(num1, num2, pk, two_to_l, mat=None):
     """
     Calculates the value "z"
     :param num1: First encrypted number to be compared
     :param num2: Second encrypted number to be compared
     :param pk: Public Key
-    :param msg_len: Length of the original plain text
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
     :return:
     """
     # Encrypt 2^l
-    length_enc = enc(two_to_l, pk)
+    length_enc = enc(two_to_l, pk) if mat is None else mat.length_enc
 
     # add = [2^l] + [a]
     add = secure_addition(length_enc, num1, pk)
@@ -295,20 +705,25 @@ def calc_z(num1, num2, pk, two_to_l):
     return z
 
 
-def calc_c(z, msg_len, sec_param, pk):
+def calc_c(z, msg_len, sec_param, pk, mat=None):
     """
     Calculates the value c
     :param z: Value z
     :param msg_len: Length of the original message
-    :param sec_param: Security Parameter
+    :param sec_param: Security Parameter in bits
     :param pk: Public Key
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
     :return: the value c and r
     """
-    # Calculate the random value r
-    r = sec_param + msg_len + 1
+    if mat is None:
+        # Calculate the random value r
+        r = calc_r(msg_len, sec_param)
+
+        # Encrypt r in order to be able to operate with it
+        r_enc = enc(r, pk)
 
-    # Encrypt r in order to be able to operate with it
-    r_enc = enc(r, pk)
+    else:  # Precomputed r
+        r, r_enc = mat.r, mat.r_enc
 
     # c = [z] + [r]
     c = secure_addition(z, r_enc, pk)
@@ -316,13 +731,15 @@ def calc_c(z, msg_len, sec_param, pk):
     return c, r  # Both c and r are returned
 
 
-def calc_c_list(c, sk, pk, msg_len, two_to_l):
+def calc_c_list(c, sk, pk, msg_len, two_to_l, mat=None):
     """
     Calculates the encryption of all the bits of c
     :param c: Value c
     :param sk: Secret Key
     :param pk: Public Key
     :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. The bits are encrypted if it is not set
     :return: A list with all the bits of c encrypted
     """
     dec_c = dec(c, sk, pk)  # Decrypt c
@@ -338,7 +755,10 @@ def calc_c_list(c, sk, pk, msg_len, two_to_l):
 
     # Encrypt all the different bits and save them in a list
     while i < len(dec_c_bin):
-        enc_i = enc(int(dec_c_bin[i]), pk)  # Encrypt the bit i
+        if mat is None:
+            enc_i = enc(int(dec_c_bin[i]), pk)  # Encrypt the bit i
+        else:  # Precomputed encryption of the bit i
+            enc_i = mat.bit_enc[int(dec_c_bin[i])][len(dec_c_bin) - 1 - i]
         c_list.append(enc_i)  # Add new element
 
         i += 1  # Update index
@@ -349,108 +769,257 @@ def calc_c_list(c, sk, pk, msg_len, two_to_l):
     return c_list  # Return the encryption of all the bits
 
 
-def calc_e_list(r, c_encrypt, pk, msg_len, two_to_l):
+def calc_e_bits(c_encrypt, r_list, r_encoded, r_neg, sum_op, pk):
     """
-    Calculates the list of e values
+    Calculates the values of a run of consecutive bits shared by their e values
+    :param c_encrypt: List with the values from c encrypted of the bits
+    :param r_list: List with the bits of r
+    :param r_encoded: List of [r_i]
+    :param r_neg: List of [-r_i]. They are calculated if it is not set
+    :param sum_op: Sum of the xor of the bits above the run, the start of the suffix sums
+    :param pk: Public Key
+    :return: The list of [-r_i], the list of suffix sums sum_op + sum_{j > i} xor_j and the sum of all the xor
+    """
+    # subs_j = [c_j] * r_j. The bits of r are known in plain text
+    subs_list = [secure_scalar_mult(c_j, r_list[j], pk) for j, c_j in enumerate(c_encrypt)]
+
+    # Negate all the subtracted values at once: [-r_i] and [-c_j * r_j]
+    if r_neg is None:
+        neg_list = secure_neg_many(r_encoded + subs_list, pk)
+        r_neg = neg_list[:len(r_encoded)]
+        subs_neg = neg_list[len(r_encoded):]
+
+    else:  # [-r_i] precomputed
+        subs_neg = secure_neg_many(subs_list, pk)
+
+    # xor_j = [c_j XOR r_j] = [c_j] + [r_j] - [c_j] * r_j - [c_j] * r_j
+    # It does not depend on i, so it is calculated once for every bit
+    xor_list = []
+    for j, val in enumerate(c_encrypt):
+        xor_j = secure_addition(c_encrypt[j], r_encoded[j], pk)
+        xor_j = secure_addition(xor_j, subs_neg[j], pk)
+        xor_j = secure_addition(xor_j, subs_neg[j], pk)
+        xor_list.append(xor_j)
+
+    sum_list = [None] * len(c_encrypt)
+
+    # Build the suffix sums sum_{j > i} xor_j in a single backward pass
+    for i in range(len(c_encrypt) - 1, -1, -1):
+        sum_list[i] = sum_op
+
+        # Add xor_i for the next e value
+        sum_op = secure_addition(sum_op, xor_list[i], pk)
+
+    return r_neg, sum_list, sum_op
+
+
+def calc_e_sums(r, c_encrypt, pk, msg_len, two_to_l, mat=None):
+    """
+    Calculates the values shared by all the e values
     :param r: Value r
     :param c_encrypt: List with the values from c encrypted
     :param pk: Public Key
     :param msg_len: Length of the original message
-    :return:
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
+    :return: [1], the list of [-r_i] and the list of suffix sums [0] + sum_{j > i} xor_j
     """
-    # List which will store the values for e_i
-    e_list = []
+    if mat is None:
+        r_list = calc_r_list(r, msg_len, two_to_l)
 
-    # Calculate r modulus 2^l
-    r_mod = r % two_to_l
+        # Encode 1 and 0 to operate with it
+        enc_1 = enc(1, pk)
+        enc_0 = enc(0, pk)
 
-    # Set r in modulus 2^l to binary
-    r_bin = num_to_bin(r_mod)
+        r_encoded = []
+        # Encode r to operate with it
+        for i, val in enumerate(r_list):
+            r_encoded.append(enc(r_list[i], pk))
+        r_neg = None
 
-    # Check that r has all the bit digits
-    r_filled = fill_left_zeros(r_bin, msg_len - len(str(r_bin)))
+    else:  # Precomputed values
+        r_list, enc_1, enc_0, r_encoded, r_neg = mat.r_list, mat.enc_1, mat.enc_0, mat.r_encoded, mat.r_neg
 
-    # r_filled as a list
-    r_list = [int(x) for x in str(r_filled)]
+    r_neg, sum_list, _ = calc_e_bits(c_encrypt, r_list, r_encoded, r_neg, enc_0, pk)
 
-    # Reverse the list of r in order to match the logical model of the slides
-    r_list = r_list[::-1]
+    return enc_1, r_neg, sum_list
 
-    # Encode 1 and 0 to operate with it
-    enc_1 = enc(1, pk)
-    enc_0 = enc(0, pk)
 
-    r_encoded = []
-    # Encode r to operate with it
-    for i, val in enumerate(r_list):
-        r_encoded.append(enc(r_list[i], pk))
-
-    for i, val in enumerate(c_encrypt):
-        # Perform the operations for the left addition
-        # left_add_1 = [1] + [c_i]
-        left_add_1 = secure_addition(enc_1, c_encrypt[i], None, n=two_to_l)
+def calc_e_i(i, c_encrypt, enc_1, r_neg, sum_list, pk):
+    """
+    Calculates the value e_i = [1] + [c_i] - [r_i] + sum_{j > i} xor_j
+    :param i: Index of the bit
+    :param c_encrypt: List with the values from c encrypted
+    :param enc_1: [1]
+    :param r_neg: List of [-r_i]
+    :param sum_list: List of suffix sums from calc_e_sums()
+    :param pk: Public Key
+    :return: The value e_i
+    """
+    # Perform the operations for the left addition
+    # left_add_1 = [1] + [c_i]
+    left_add_1 = secure_addition(enc_1, c_encrypt[i], pk)
 
-        # left_add = [1] + [c_i] - [r_i]
-        left_add = secure_subst(left_add_1, r_encoded[i], None, n=two_to_l)
+    # left_add = [1] + [c_i] - [r_i]
+    left_add = secure_addition(left_add_1, r_neg[i], pk)
 
-        # Reset to zero the cumulative sum
-        sum_op = enc_0
+    # e_i = left_add + sum_{j > i} xor_j
+    return secure_addition(left_add, sum_list[i], pk)
 
-        # Calculate the sum
-        for j in range(i + 1, msg_len):
-            # left_sum_j = [c_j] + [r_j]
-            left_sum_j = secure_addition(c_encrypt[j], r_encoded[j], None, n=two_to_l)
 
-            # subs = [c_j] * [r_i]
-            subs = secure_scalar_mult(c_encrypt[j], r_encoded[j], None, n=two_to_l)
+def calc_e_list(r, c_encrypt, pk, msg_len, two_to_l, mat=None):
+    """
+    Calculates the list of e values
+    :param r: Value r
+    :param c_encrypt: List with the values from c encrypted
+    :param pk: Public Key
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
+    :return:
+    """
+    enc_1, r_neg, sum_list = calc_e_sums(r, c_encrypt, pk, msg_len, two_to_l, mat)
 
-            # left_sum_j = [c_j] + [r_j] - [c_j] * [r_i] - [c_j] * [r_i]
-            left_sum_j = secure_subst(left_sum_j, subs, None, n=two_to_l)
-            left_sum_j = secure_subst(left_sum_j, subs, None, n=two_to_l)
+    return [calc_e_i(i, c_encrypt, enc_1, r_neg, sum_list, pk) for i in range(len(c_encrypt))]
 
-            # Update the sum value
-            sum_op = secure_addition(sum_op, left_sum_j, None, n=two_to_l)
 
-        # e_i = left_add + sum_op
-        e_i = secure_addition(left_add, sum_op, None, n=two_to_l)
+def gen_e_list(r, c_encrypt, pk, msg_len, two_to_l, mat=None):
+    """
+    Generates the e values one by one in a random order.
+    Each e_i is only calculated when it is requested, so the consumer can stop early.
+    The order is permuted so stopping does not leak the position of the zero
+    :param r: Value r
+    :param c_encrypt: List with the values from c encrypted
+    :param pk: Public Key
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
+    :return: A generator of the e values
+    """
+    enc_1, r_neg, sum_list = calc_e_sums(r, c_encrypt, pk, msg_len, two_to_l, mat)
 
-        # Add the calculated value to the list
-        e_list.append(e_i)
+    order = list(range(len(c_encrypt)))
+    secrets.SystemRandom().shuffle(order)  # Random order of the e values
 
-    return e_list  # Return a list with all the e values
+    for i in order:
+        sqp_stats.e_computed += 1
+        yield calc_e_i(i, c_encrypt, enc_1, r_neg, sum_list, pk)
 
 
 def check_e(e_list, pk, sk):
+    """
+    Checks if any of the e values is an encryption of zero.
+    It stops at the first zero, which also stops a generator of e values
+    :param e_list: List or generator of e values
+    :param pk: Public Key
+    :param sk: Secret Key
+    :return: 1 if there is a zero, otherwise 0
+    """
     # Go through all the e_i to check if there is a e_i = 0
-    for i, val in enumerate(e_list):
-        e_i = dec(e_list[i], sk, pk)
-        # e_i = e_i % (2 ** msg_len)  # Reduce e_i to mod 2^l
+    # The e values are at most l + 2, so the zero test modulus p is enough
+    for e_enc in e_list:
+        sqp_stats.e_decrypted += 1
 
-        if e_i == 0:  # r larger than c
+        if is_zero(e_enc, sk, pk):  # r larger than c
             return 1
 
     return 0  # c larger than r
 
 
-def calc_final_z(c, r, msg_len, comp_result, sk, pk, two_to_l):
-    # Encrypt the value r to operate with it
-    enc_r = enc(r, pk)
-
-    # subs = [c] - [r]
-    subs = secure_subst(c, enc_r, pk)
-
-    # right_add =  lambda{0,1} * 2^l
-    right_add = comp_result * two_to_l
+def calc_final_z(c, r, msg_len, comp_result, sk, pk, two_to_l, mat=None):
+    """
+    Calculates the most significant bit of z: z_l = (d div 2^l) - (r div 2^l) - lambda
+    :param c: Value c
+    :param r: Value r
+    :param msg_len: Length of the original message
+    :param comp_result: lambda. 1 if (c mod 2^l) < (r mod 2^l)
+    :param sk: Secret Key
+    :param pk: Public Key
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. A new obfuscator is used if it is not set
+    :return: The most significant bit of z
+    """
+    # [d div 2^l], obtained from the decryption of c
+    d_l = enc(dec(c, sk, pk) >> msg_len, pk, None if mat is None else mat.final_obf)
 
-    subs = secure_addition(subs, enc(right_add, pk), pk)
+    # [z_l] = [d div 2^l] - (r div 2^l) - lambda
+    z_l = as_number(d_l, pk) - (r >> msg_len) - comp_result
 
     # Get the most significant bit of z
-    z = dec(subs, sk, pk) >> msg_len
+    z = dec(z_l, sk, pk)
 
     return z
 
 
-def sqp(num1, num2, pk, sk, msg_len):
+def calc_z_const(num1, num2, pk, two_to_l):
+    """
+    Calculates the value "z" against a public value: [z] = [a] + (2^l - b).
+    The plain text b is folded into the offset, so it is not encrypted
+    :param num1: Encrypted number to be compared
+    :param num2: Public number to be compared, 0 <= b < 2^l
+    :param pk: Public Key
+    :param two_to_l: 2^l
+    :return: The value z
+    """
+    if not 0 <= num2 < two_to_l:  # z would not have l + 1 bits
+        raise ValueError("Public value {} out of range".format(num2))
+
+    return as_number(num1, pk) + (two_to_l - num2)
+
+
+def sqp_z(z, pk, sk, msg_len, mat=None, workers=None, dgk_keys=None):
+    """
+    Performs the Secure Comparison Protocol from the value z. Its result is the most significant bit of z
+    :param z: Encrypted value z = 2^l + a - b
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original message
+    :param mat: Precomputed material of the comparison, from calc_material(). It is calculated if it is not set.
+    Under DGK only its r and final obfuscator are used, the bits of c are encrypted online
+    :param workers: Amount of worker processes to calculate and check the e values. None or 1 uses this process
+    :param dgk_keys: DGK public and private keys. If they are set the bitwise part runs under DGK
+    :return: 1 if a >= b, otherwise 0
+    """
+    two_to_l = 2 ** msg_len
+
+    c, r = calc_c(z, msg_len, SEC_PARAM, pk, mat)
+
+    if dgk_keys is not None:
+        # Imported here as the DGK module imports this one
+        from src.paillier.dgk import calc_c_list_dgk, gen_e_list_dgk, check_e_dgk
+
+        dgk_pk, dgk_sk = dgk_keys
+        if msg_len + 2 >= dgk_pk.u:  # The e values would wrap around
+            raise ValueError("DGK plain text space too small for {} bits".format(msg_len))
+
+        # Bitwise part under DGK
+        c_encrypt = calc_c_list_dgk(c, sk, pk, msg_len, two_to_l, dgk_pk)
+        comp_result = check_e_dgk(gen_e_list_dgk(r, c_encrypt, msg_len, two_to_l, dgk_pk), dgk_sk)
+
+    elif workers is not None and workers > 1:
+        # Imported here as the parallel module imports this one
+        from src.sqp.sqp_parallel import check_e_parallel
+
+        c_encrypt = calc_c_list(c, sk, pk, msg_len, two_to_l, mat)
+
+        comp_result = check_e_parallel(r, c_encrypt, pk, sk, msg_len, two_to_l, mat, workers)
+
+    else:
+        c_encrypt = calc_c_list(c, sk, pk, msg_len, two_to_l, mat)
+
+        # The e values are only calculated until a zero is found
+        e_list = gen_e_list(r, c_encrypt, pk, msg_len, two_to_l, mat)
+
+        comp_result = check_e(e_list, pk, sk)
+
+    result_cpm = calc_final_z(c, r, msg_len, comp_result, sk, pk, two_to_l, mat)
+
+    sqp_stats.comparisons += 1
+
+    return result_cpm
+
+
+def sqp(num1, num2, pk, sk, msg_len, mat=None, workers=None, dgk_keys=None):
     """
     Performs the Secure Comparison Protocol
     :param msg_len: Length of the original message
@@ -458,21 +1027,74 @@ def sqp(num1, num2, pk, sk, msg_len):
     :param num2: Second encrypted number to be compared
     :param sk: Secret Key
     :param pk: Public Key
-    :return:
+    :param mat: Precomputed material of the comparison, from calc_material(). It is calculated if it is not set
+    :param workers: Amount of worker processes to calculate and check the e values. None or 1 uses this process
+    :param dgk_keys: DGK public and private keys. If they are set the bitwise part runs under DGK
+    :return: 1 if num1 >= num2, otherwise 0
     """
-    two_to_l = 2 ** msg_len
-
     # Calculate z
-    z = calc_z(num1, num2, pk, two_to_l)
+    z = calc_z(num1, num2, pk, 2 ** msg_len, mat)
 
-    c, r = calc_c(z, msg_len, SEC_PARAM, pk)
+    return sqp_z(z, pk, sk, msg_len, mat, workers, dgk_keys)
 
-    c_encrypt = calc_c_list(c, sk, pk, msg_len, two_to_l)
 
-    e_list = calc_e_list(r, c_encrypt, pk, msg_len, two_to_l)
+def sqp_const(num1, num2, pk, sk, msg_len, mat=None, workers=None, dgk_keys=None):
+    """
+    Performs the Secure Comparison Protocol of an encrypted number against a public one
+    :param num1: Encrypted number to be compared
+    :param num2: Public number to be compared, 0 <= num2 < 2^l
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original message
+    :param mat: Precomputed material of the comparison, from calc_material(). It is calculated if it is not set
+    :param workers: Amount of worker processes to calculate and check the e values. None or 1 uses this process
+    :param dgk_keys: DGK public and private keys. If they are set the bitwise part runs under DGK
+    :return: 1 if num1 >= num2, otherwise 0
+    """
+    z = calc_z_const(num1, num2, pk, 2 ** msg_len)
 
-    comp_result = check_e(e_list, pk, sk)
+    return sqp_z(z, pk, sk, msg_len, mat, workers, dgk_keys)
 
-    result_cpm = calc_final_z(c, r, msg_len, comp_result, sk, pk, two_to_l)
 
-    return result_cpm
+def sqp_const_many(num1, bounds, pk, sk, msg_len, mats=None, workers=None, dgk_keys=None):
+    """
+    Compares an encrypted number against a sorted list of public boundaries.
+    The results are monotone, so a binary search only runs log2(k + 1) comparisons,
+    and every z is obtained from the shared [a + 2^l] with one plain text addition.
+    The amount of ones is the index of the bucket of the number
+    :param num1: Encrypted number to be compared
+    :param bounds: Sorted list of public boundaries, 0 <= b_i < 2^l
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original message
+    :param mats: List of precomputed materials, one for each comparison of the search, so len(bounds).bit_length()
+    of them. Each comparison calculates its own material if it is not set
+    :param workers: Amount of worker processes to calculate and check the e values. None or 1 uses this process
+    :param dgk_keys: DGK public and private keys. If they are set the bitwise part runs under DGK
+    :return: A list with 1 if num1 >= b_i, otherwise 0, for every boundary
+    """
+    two_to_l = 2 ** msg_len
+
+    if any(bounds[i] > bounds[i + 1] for i in range(len(bounds) - 1)):
+        raise ValueError("The boundaries are not sorted")
+    if bounds and not (0 <= bounds[0] and bounds[-1] < two_to_l):
+        raise ValueError("Boundaries out of range")
+
+    shared = as_number(num1, pk) + two_to_l  # [a + 2^l], shared by all the comparisons
+
+    if mats is not None and len(mats) < len(bounds).bit_length():  # A material can only be used once
+        raise ValueError("{} materials for {} comparisons".format(len(mats), len(bounds).bit_length()))
+    mat_iter = iter(mats) if mats is not None else None
+
+    # Binary search of the first boundary larger than num1
+    low, high = 0, len(bounds)
+    while low < high:
+        mid = (low + high) // 2
+
+        mat = next(mat_iter) if mat_iter is not None else None  # Fresh material for each comparison
+        if sqp_z(shared - bounds[mid], pk, sk, msg_len, mat, workers, dgk_keys):  # num1 >= b_mid
+            low = mid + 1
+        else:
+            high = mid
+
+    return [1] * low + [0] * (len(bounds) - low)
@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from src.constants.const import BATCH_WORKERS, BATCH_CHUNK
+from src.paillier.paillier import enc, dec
+
+# Keys of the worker process. They are set once per worker by init_worker()
+_worker_pk = None
+_worker_sk = None
+
+
+def init_worker(pk, sk=None):
+    """
+    Initializer of the worker processes. Stores the keys so they are not sent with every item
+    :param pk: Public Key
+    :param sk: Secret Key. Only needed for decrypting
+    :return:
+    """
+    global _worker_pk, _worker_sk
+    _worker_pk = pk
+    _worker_sk = sk
+
+
+def enc_worker(msg):
+    """
+    Encrypts a message with the Public Key of the worker
+    :param msg: Message to be encrypted
+    :return: The encrypted value
+    """
+    return enc(msg, _worker_pk)
+
+
+def dec_worker(enc_msg):
+    """
+    Decrypts a message with the keys of the worker
+    :param enc_msg: Encrypted message
+    :return: The decrypted message
+    """
+    return dec(enc_msg, _worker_sk, _worker_pk)
+
+
+def enc_many(values, pk, workers=BATCH_WORKERS, chunk_size=BATCH_CHUNK):
+    """
+    Encrypts a list of messages splitting the work across a pool of processes
+    :param values: List of messages to be encrypted
+    :param pk: Public Key
+    :param workers: Amount of worker processes. None uses all the cores
+    :param chunk_size: Amount of messages sent to a worker at once
+    :return: A list with the encrypted values in the same order as the input
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(pk,)) as executor:
+        return list(executor.map(enc_worker, values, chunksize=chunk_size))
+
+
+def dec_many(ciphertexts, sk, pk, workers=BATCH_WORKERS, chunk_size=BATCH_CHUNK):
+    """
+    Decrypts a list of encrypted messages splitting the work across a pool of processes
+    :param ciphertexts: List of encrypted messages
+    :param sk: Secret Key
+    :param pk: Public Key
+    :param workers: Amount of worker processes. None uses all the cores
+    :param chunk_size: Amount of messages sent to a worker at once
+    :return: A list with the decrypted messages in the same order as the input
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(pk, sk)) as executor:
+        return list(executor.map(dec_worker, ciphertexts, chunksize=chunk_size))
@@ -0,0 +1,195 @@
+import mmap
+import os
+import struct
+
+from src.constants.const import CT_BATCH
+from src.paillier.paillier_store import key_fingerprint
+
+# Header of the ciphertext files, little endian: magic, version, width of the ciphertexts in bytes,
+# amount of ciphertexts and fingerprint of the Public Key
+CT_MAGIC = b"PCTX"
+CT_VERSION = 1
+CT_HEADER = struct.Struct("<4sB3xIQ8s4x")
+
+
+def calc_width(pk):
+    """
+    Calculates the bytes of a ciphertext of a Public Key
+    :param pk: Public Key
+    :return: The width in bytes
+    """
+    return (int(pk.n_2).bit_length() + 7) // 8
+
+
+class CiphertextWriter:
+    """
+    Writes ciphertexts of one Public Key into a file as fixed width little endian integers.
+    The ciphertexts are written in batches of CT_BATCH, so the memory used does not grow with the file.
+    The amount of ciphertexts is written into the header when the writer is closed
+    """
+    __slots__ = ("path", "width", "fingerprint", "count", "output_f")
+
+    def __init__(self, path, pk):
+        self.path = path
+        self.width = calc_width(pk)
+        self.fingerprint = bytes.fromhex(key_fingerprint(pk))
+        self.count = 0  # Ciphertexts written
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        self.output_f = open(path, "wb")
+        self.output_f.write(self.header())
+
+    def header(self):
+        """
+        Packs the header of the file
+        :return: The bytes of the header
+        """
+        return CT_HEADER.pack(CT_MAGIC, CT_VERSION, self.width, self.count, self.fingerprint)
+
+    def write(self, ciphertext):
+        """
+        Writes one ciphertext
+        :param ciphertext: The ciphertext
+        :return:
+        """
+        self.output_f.write(int(ciphertext).to_bytes(self.width, "little"))
+        self.count += 1
+
+    def write_many(self, ciphertexts):
+        """
+        Writes the ciphertexts of an iterable, which can be a generator
+        :param ciphertexts: Iterable with the ciphertexts
+        :return: The amount of ciphertexts written
+        """
+        width = self.width
+        written = 0
+        batch = []
+
+        for ciphertext in ciphertexts:
+            batch.append(int(ciphertext).to_bytes(width, "little"))
+            if len(batch) == CT_BATCH:
+                self.output_f.write(b"".join(batch))
+                written += len(batch)
+                batch = []
+
+        self.output_f.write(b"".join(batch))
+        written += len(batch)
+
+        self.count += written
+        return written
+
+    def close(self):
+        """
+        Writes the amount of ciphertexts into the header and closes the file
+        :return:
+        """
+        if not self.output_f.closed:
+            self.output_f.seek(0)
+            self.output_f.write(self.header())
+            self.output_f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CiphertextReader:
+    """
+    Reads a ciphertext file through a memory map. The ciphertexts are only decoded when they are accessed
+    by index or slice, so opening a file of millions of ciphertexts does not load them
+    """
+    __slots__ = ("path", "width", "count", "fingerprint", "input_f", "data")
+
+    def __init__(self, path, pk=None):
+        self.path = path
+        self.input_f = open(path, "rb")
+
+        try:
+            header = self.input_f.read(CT_HEADER.size)
+            if len(header) < CT_HEADER.size:
+                raise ValueError("{} is not a ciphertext file".format(path))
+
+            magic, version, self.width, self.count, self.fingerprint = CT_HEADER.unpack(header)
+            if magic != CT_MAGIC or version != CT_VERSION:
+                raise ValueError("{} is not a ciphertext file of version {}".format(path, CT_VERSION))
+
+            if pk is not None and (self.fingerprint.hex() != key_fingerprint(pk) or self.width != calc_width(pk)):
+                raise ValueError("The ciphertexts of {} do not belong to the key used".format(path))
+
+            if os.fstat(self.input_f.fileno()).st_size != CT_HEADER.size + self.count * self.width:
+                raise ValueError("{} is truncated or was not closed".format(path))
+
+            self.data = mmap.mmap(self.input_f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.input_f.close()
+            raise
+
+    def get(self, idx):
+        """
+        Decodes one ciphertext
+        :param idx: Index of the ciphertext, 0 <= idx < count
+        :return: The ciphertext
+        """
+        start = CT_HEADER.size + idx * self.width
+        return int.from_bytes(self.data[start:start + self.width], "little")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.get(i) for i in range(*idx.indices(self.count))]
+
+        if idx < 0:  # From the end
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError("Ciphertext {} out of range".format(idx))
+
+        return self.get(idx)
+
+    def __iter__(self):
+        for start in range(0, self.count, CT_BATCH):
+            yield from self[start:start + CT_BATCH]
+
+    def close(self):
+        """
+        Closes the memory map and the file
+        :return:
+        """
+        if not self.input_f.closed:
+            self.data.close()
+            self.input_f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def save_ciphertexts(path, pk, ciphertexts):
+    """
+    Saves the ciphertexts of an iterable into a file
+    :param path: Path of the file
+    :param pk: Public Key of the ciphertexts
+    :param ciphertexts: Iterable with the ciphertexts, which can be a generator
+    :return: The amount of ciphertexts saved
+    """
+    with CiphertextWriter(path, pk) as writer:
+        return writer.write_many(ciphertexts)
+
+
+def load_ciphertexts(path, pk):
+    """
+    Streams the ciphertexts of a file, CT_BATCH of them in memory at once
+    :param path: Path of the file
+    :param pk: Public Key the ciphertexts have to belong to
+    :return: A generator of the ciphertexts
+    """
+    with CiphertextReader(path, pk) as reader:
+        yield from reader
@@ -0,0 +1,127 @@
+import secrets
+
+from src.constants.const import FIXED_EXP_BITS, FIXED_WINDOW
+from src.paillier import backend
+
+_tables = {}  # Fixed base tables attached to a Public Key. They are indexed by the modulus of the ciphertexts
+
+
+def calc_h_s(pk):
+    """
+    Calculates a fixed public base h_s = h^(n^s) mod n^(s+1), with h = -x^2 mod n for a random x
+    :param pk: Public Key
+    :return: The base h_s
+    """
+    x = secrets.randbelow(pk.n - 2) + 2  # Get a random value from 2 to n - 1
+    h = pk.n - backend.mulmod(x, x, pk.n)  # -x^2 mod n
+    return backend.powmod(h, pk.n_s, pk.n_2)
+
+
+class FixedBaseTable:
+    """
+    Fixed base windowed table of h_s for obfuscators h_s^a mod n^(s+1) with a short random exponent a.
+    Row i holds h_s^(j * 2^(window * i)) for every j < 2^window, so an obfuscator only needs one
+    modular multiplication per window of the exponent instead of a full exponentiation by n.
+    The exponents have FIXED_EXP_BITS bits, twice the security level, so the security relies on the discrete log
+    with short exponents. Damgard-Jurik-Nielsen use exponents of ceil(k / 2) bits, which exp_bits can be set to
+    """
+    __slots__ = ("n_2", "h_s", "exp_bits", "window", "rows")
+
+    def __init__(self, n_2, h_s, exp_bits=FIXED_EXP_BITS, window=FIXED_WINDOW, rows=None):
+        self.n_2 = n_2  # Modulus of the ciphertexts
+        self.h_s = h_s  # Fixed base
+        self.exp_bits = exp_bits  # Bits of the random exponents
+        self.window = window  # Bits of the exponent covered by each row
+        self.rows = self.calc_rows() if rows is None else rows
+
+    def calc_rows(self):
+        """
+        Calculates the rows of the table
+        :return: A list with the rows
+        """
+        n_2 = self.n_2
+        rows = []
+        base = self.h_s  # h_s^(2^(window * i))
+
+        for _ in range(-(-self.exp_bits // self.window)):  # One row per window of the exponent
+            row = [1, base]
+            for _ in range(2 ** self.window - 2):
+                row.append(backend.mulmod(row[-1], base, n_2))
+            rows.append(row)
+
+            base = backend.mulmod(row[-1], base, n_2)  # base^(2^window)
+
+        return rows
+
+    def powmod(self, exp):
+        """
+        Calculates h_s^exp mod n^(s+1) with the table
+        :param exp: Exponent, 0 <= exp < 2^exp_bits
+        :return: h_s^exp mod n^(s+1)
+        """
+        n_2 = self.n_2
+        mask = 2 ** self.window - 1
+        result = 1
+
+        for row in self.rows:
+            digit = exp & mask
+            if digit:  # Row entries of 0 are 1
+                result = backend.mulmod(result, row[digit], n_2)
+            exp >>= self.window
+
+        return result
+
+    def get(self):
+        """
+        Gets a new obfuscator h_s^a mod n^(s+1) with a random short exponent a
+        :return: The obfuscator
+        """
+        return self.powmod(secrets.randbits(self.exp_bits))
+
+    def size(self):
+        """
+        Calculates the memory taken by the entries of the table
+        :return: The amount of bytes
+        """
+        return sum((int(entry).bit_length() + 7) // 8 for row in self.rows for entry in row)
+
+    def toString(self):
+        print("Exponent bits: {}\nWindow: {}\nRows: {}\nEntries: {}\nSize: {} bytes"
+              .format(self.exp_bits, self.window, len(self.rows), sum(len(row) for row in self.rows), self.size()))
+
+
+def attach_table(pk, table=None, exp_bits=FIXED_EXP_BITS, window=FIXED_WINDOW):
+    """
+    Attaches a fixed base table to the Public Key "pk".
+    Every enc() with "pk" takes its obfuscator from the table from now on
+    :param pk: Public Key
+    :param table: Fixed base table, for example loaded from disk. A new one is calculated if it is not set
+    :param exp_bits: Bits of the random exponents of a new table
+    :param window: Bits of the exponent covered by each row of a new table
+    :return: The table attached
+    """
+    if table is None:
+        table = FixedBaseTable(pk.n_2, calc_h_s(pk), exp_bits, window)
+    elif table.n_2 != pk.n_2:
+        raise ValueError("The fixed base table does not belong to the key used")
+
+    _tables[pk.n_2] = table
+    return table
+
+
+def detach_table(pk):
+    """
+    Removes the fixed base table of the Public Key "pk"
+    :param pk: Public Key
+    :return:
+    """
+    _tables.pop(pk.n_2, None)
+
+
+def get_table(pk):
+    """
+    Gets the fixed base table of the Public Key "pk"
+    :param pk: Public Key
+    :return: The table, None if the key has no table attached
+    """
+    return _tables.get(pk.n_2)
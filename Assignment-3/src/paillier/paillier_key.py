@@ -1,26 +1,48 @@
 class PublicKey:
-    n = None
-    n_2 = None
-    g = None
+    __slots__ = ("n", "n_2", "g", "s", "n_s")
 
-    def __init__(self, n, g):
+    def __init__(self, n, g, s=1):
         self.n = n
-        self.n_2 = n * n
         self.g = g
+        self.s = s  # Damgard-Jurik exponent. 1 is Paillier
+        self.n_s = n ** s  # Modulus of the plain texts
+        self.n_2 = n ** (s + 1)  # Modulus of the ciphertexts, n^2 for Paillier
 
     def toString(self):
-        print("Public Key:\n n: {}\n g: {}"
-              .format(self.n, self.g))
+        print("Public Key:\n n: {}\n g: {}\n s: {}"
+              .format(self.n, self.g, self.s))
 
 
 class PrivateKey:
-    lamb = None
-    mu = None
+    # The CRT values are only set when the prime factors of n are known
+    __slots__ = ("lamb", "mu", "p", "q", "p_2", "q_2", "hp", "hq", "q_inv")
 
-    def __init__(self, lamb, mu):
+    def __init__(self, lamb, mu, p=None, q=None, hp=None, hq=None, q_inv=None):
         self.lamb = lamb
         self.mu = mu
 
+        if p is not None and q is not None:  # Keep the CRT values
+            self.p = p
+            self.q = q
+            self.p_2 = p * p
+            self.q_2 = q * q
+            self.hp = hp
+            self.hq = hq
+            self.q_inv = q_inv
+
+        else:  # No CRT values
+            self.p, self.q, self.p_2, self.q_2 = None, None, None, None
+            self.hp, self.hq, self.q_inv = None, None, None
+
+    def has_crt(self):
+        """
+        Checks if the key can be used for the CRT decryption
+        :return: True if the prime factors and the CRT constants are set
+        """
+        return self.p is not None and self.hp is not None
+
     def toString(self):
         print("Private Key:\n lamb: {}\n mu: {}"
               .format(self.lamb, self.mu))
+        if self.has_crt():
+            print(" p: {}\n q: {}".format(self.p, self.q))
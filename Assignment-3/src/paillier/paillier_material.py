@@ -0,0 +1,25 @@
+class SqpMaterial:
+    """
+    Values of the Secure Comparison Protocol that do not depend on the compared numbers.
+    They are calculated ahead of time for a key and a message length, and each material is used by one comparison
+    """
+    __slots__ = ("msg_len", "two_to_l", "r", "r_list", "length_enc", "r_enc", "enc_1", "enc_0", "r_encoded",
+                 "r_neg", "bit_enc", "final_obf")
+
+    def __init__(self, msg_len, r, r_list, length_enc, r_enc, enc_1, enc_0, r_encoded, r_neg, bit_enc, final_obf):
+        self.msg_len = msg_len
+        self.two_to_l = 2 ** msg_len
+        self.r = r  # Value r
+        self.r_list = r_list  # Bits of r mod 2^l, least significant first
+        self.length_enc = length_enc  # [2^l]
+        self.r_enc = r_enc  # [r]
+        self.enc_1 = enc_1  # [1]
+        self.enc_0 = enc_0  # [0]
+        self.r_encoded = r_encoded  # [r_i]
+        self.r_neg = r_neg  # [-r_i]
+        self.bit_enc = bit_enc  # [0] and [1] for each bit of c: bit_enc[bit][i]
+        self.final_obf = final_obf  # Obfuscator for the encryption of d div 2^l
+
+    def toString(self):
+        print("SQP Material:\n msg_len: {}\n r: {}"
+              .format(self.msg_len, self.r))
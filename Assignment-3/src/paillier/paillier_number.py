@@ -0,0 +1,137 @@
+from math import comb
+
+from src.constants.const import CTX_CACHE
+from src.paillier import backend
+
+_contexts = {}  # Key contexts already created. They are indexed by the modulus of the ciphertexts
+
+
+def calc_n_plus_m(msg, n, s, n_s, n_2):
+    """
+    Calculates (n + 1)^msg mod n^(s+1) with the binomial theorem: sum_{k=0}^{s} C(msg, k) * n^k.
+    For Paillier it is (1 + msg * n) mod n^2
+    :param msg: Plain text
+    :param n: Modulus n from the Public Key
+    :param s: Damgard-Jurik exponent
+    :param n_s: n^s
+    :param n_2: n^(s+1)
+    :return: (n + 1)^msg mod n^(s+1)
+    """
+    msg = msg % n_s  # n + 1 has order n^s
+
+    if s == 1:
+        return (1 + msg * n) % n_2
+
+    return sum(comb(msg, k) * n ** k for k in range(s + 1)) % n_2
+
+
+class KeyContext:
+    """
+    Values of a Public Key precomputed once and shared by all its encrypted numbers
+    """
+    __slots__ = ("pk", "n", "n_s", "n_2", "g", "n_plus", "neg_cache")
+
+    def __init__(self, pk):
+        self.pk = pk
+        self.n = pk.n
+        self.n_s = pk.n_s
+        self.n_2 = pk.n_2
+        self.g = pk.g
+        self.n_plus = pk.n + 1
+        self.neg_cache = {}  # Negations of the ciphertexts that are subtracted
+
+    def neg(self, ciphertext):
+        """
+        Negates a ciphertext: [m] -> [-m]
+        The results are cached, as the same ciphertext is usually subtracted many times
+        :param ciphertext: Ciphertext to be negated
+        :return: The negated ciphertext
+        """
+        neg_c = self.neg_cache.get(ciphertext)
+
+        if neg_c is None:  # Not calculated yet
+            neg_c = backend.invert(ciphertext, self.n_2)  # [m]^-1 = [-m]
+            if neg_c is None:
+                raise ValueError("Ciphertext not invertible modulus n^2")
+
+            if len(self.neg_cache) >= CTX_CACHE:  # Keep the cache bounded
+                self.neg_cache.clear()
+            self.neg_cache[ciphertext] = neg_c
+
+        return neg_c
+
+    def g_m(self, msg):
+        """
+        Calculates g^msg mod n^(s+1)
+        :param msg: Plain text
+        :return: g^msg mod n^(s+1)
+        """
+        if self.g == self.n_plus:  # Closed form for g = n + 1
+            return calc_n_plus_m(msg, self.n, self.pk.s, self.n_s, self.n_2)
+
+        return backend.powmod(self.g, msg, self.n_2)
+
+
+def get_context(pk):
+    """
+    Gets the key context of a Public Key. It is only created the first time
+    :param pk: Public Key
+    :return: The key context
+    """
+    ctx = _contexts.get(pk.n_2)
+
+    if ctx is None:
+        ctx = KeyContext(pk)
+        _contexts[pk.n_2] = ctx
+
+    return ctx
+
+
+class EncryptedNumber:
+    """
+    Paillier ciphertext bound to its key context.
+    Adding or subtracting two encrypted numbers operates on the ciphertexts, while adding, subtracting or
+    multiplying by an int operates with a plain text. Each result is reduced once modulus n^2
+    """
+    __slots__ = ("ctx", "ciphertext")
+
+    def __init__(self, ctx, ciphertext):
+        self.ctx = ctx
+        self.ciphertext = ciphertext
+
+    def __add__(self, other):
+        ctx = self.ctx
+
+        if isinstance(other, EncryptedNumber):  # [a] + [b] = [a] * [b]
+            return EncryptedNumber(ctx, backend.mulmod(self.ciphertext, other.ciphertext, ctx.n_2))
+
+        # [a] + b = [a] * g^b
+        return EncryptedNumber(ctx, backend.mulmod(self.ciphertext, ctx.g_m(other), ctx.n_2))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        ctx = self.ctx
+
+        if isinstance(other, EncryptedNumber):  # [a] - [b] = [a] * [-b]
+            return EncryptedNumber(ctx, backend.mulmod(self.ciphertext, ctx.neg(other.ciphertext), ctx.n_2))
+
+        return self + (-other)  # [a] - b = [a] + (-b)
+
+    def __rsub__(self, other):
+        return -self + other  # b - [a] = [-a] + b
+
+    def __neg__(self):
+        return EncryptedNumber(self.ctx, self.ctx.neg(self.ciphertext))
+
+    def __mul__(self, scalar):
+        # [a] * k = [a]^k. Negative scalars are taken modulus n^s
+        return EncryptedNumber(self.ctx, backend.powmod(self.ciphertext, scalar % self.ctx.n_s, self.ctx.n_2))
+
+    __rmul__ = __mul__
+
+    def __int__(self):
+        return int(self.ciphertext)
+
+    def __repr__(self):
+        return "EncryptedNumber({})".format(hex(int(self.ciphertext))[:18])
@@ -0,0 +1,142 @@
+from src.constants.const import PACK_HEADROOM
+from src.paillier import backend
+from src.paillier.paillier import enc, dec
+from src.paillier.paillier_number import get_context
+
+
+class Packing:
+    """
+    Layout of k fixed width slots in one plain text. Each slot has the bits of the values plus
+    headroom bits, so the slots do not overflow into each other after additions and scalar multiplications
+    """
+    __slots__ = ("pk", "value_bits", "headroom", "width", "slots")
+
+    def __init__(self, pk, value_bits, headroom=PACK_HEADROOM):
+        self.pk = pk
+        self.value_bits = value_bits  # Bits of the packed values
+        self.headroom = headroom  # Extra bits of each slot
+        self.width = value_bits + headroom  # Bits of each slot
+        self.slots = (pk.n.bit_length() - 1) // self.width  # Slots in one plain text, which has to be below n
+
+        if self.slots < 1:
+            raise ValueError("Slots of {} bits do not fit in the plain text".format(self.width))
+
+    def pack(self, values):
+        """
+        Packs up to k values into one plain text, the first value in the least significant slot
+        :param values: List of values, 0 <= v < 2^value_bits
+        :return: The plain text
+        """
+        if len(values) > self.slots:
+            raise ValueError("{} values do not fit in {} slots".format(len(values), self.slots))
+
+        plain = 0
+        for i, val in enumerate(values):
+            if not 0 <= val < 2 ** self.value_bits:
+                raise ValueError("Value {} does not fit in {} bits".format(val, self.value_bits))
+            plain |= val << (i * self.width)
+
+        return plain
+
+    def unpack(self, plain, count=None):
+        """
+        Unpacks the slots of a plain text
+        :param plain: The plain text
+        :param count: Amount of slots used. All of them if it is not set
+        :return: The list of values
+        """
+        count = self.slots if count is None else count
+        mask = (1 << self.width) - 1
+
+        return [(plain >> (i * self.width)) & mask for i in range(count)]
+
+
+class PackedNumber:
+    """
+    Paillier ciphertext of packed values. Adding two packed numbers adds them slot by slot, adding a list of ints
+    adds a plain text slot by slot and multiplying by an int multiplies every slot.
+    The largest value a slot can hold is tracked, and an operation which could carry into the next slot
+    raises an OverflowError
+    """
+    __slots__ = ("packing", "ciphertext", "count", "bound")
+
+    def __init__(self, packing, ciphertext, count, bound):
+        self.packing = packing
+        self.ciphertext = ciphertext
+        self.count = count  # Slots used
+        self.bound = bound  # Largest value a slot can hold
+
+    def check(self, bound):
+        """
+        Checks that a bound fits in the slots
+        :param bound: Largest value a slot can hold after the operation
+        :return: The bound
+        """
+        if bound >= 2 ** self.packing.width:
+            raise OverflowError("Slots of {} bits can overflow: bound {}".format(self.packing.width, bound))
+        return bound
+
+    def __add__(self, other):
+        packing = self.packing
+        n_2 = packing.pk.n_2
+
+        if isinstance(other, PackedNumber):  # Slot wise [a] + [b]
+            if other.packing is not packing:
+                raise ValueError("Packed numbers with different layouts")
+            bound = self.check(self.bound + other.bound)
+            return PackedNumber(packing, backend.mulmod(self.ciphertext, other.ciphertext, n_2),
+                                max(self.count, other.count), bound)
+
+        # Slot wise [a] + b, with b packed as a plain text
+        bound = self.check(self.bound + max(other, default=0))
+        g_m = get_context(packing.pk).g_m(packing.pack(other))
+        return PackedNumber(packing, backend.mulmod(self.ciphertext, g_m, n_2), max(self.count, len(other)), bound)
+
+    def __radd__(self, other):
+        if isinstance(other, int) and other == 0:  # Start value of sum()
+            return self
+        return self.__add__(other)
+
+    def __mul__(self, scalar):
+        if scalar < 0:  # Negative slots would borrow from the next ones
+            raise ValueError("Only non negative scalars are supported")
+
+        bound = self.check(self.bound * scalar)
+        return PackedNumber(self.packing, backend.powmod(self.ciphertext, scalar, self.packing.pk.n_2),
+                            self.count, bound)
+
+    __rmul__ = __mul__
+
+    def __int__(self):
+        return int(self.ciphertext)
+
+    def __repr__(self):
+        return "PackedNumber({} slots, {})".format(self.count, hex(int(self.ciphertext))[:18])
+
+
+def enc_packed(values, packing):
+    """
+    Encrypts a list of values with k values in each ciphertext
+    :param values: List of values, 0 <= v < 2^value_bits
+    :param packing: Layout of the slots
+    :return: The list of packed numbers
+    """
+    bound = 2 ** packing.value_bits - 1
+
+    return [PackedNumber(packing, enc(packing.pack(values[i:i + packing.slots]), packing.pk),
+                         len(values[i:i + packing.slots]), bound)
+            for i in range(0, len(values), packing.slots)]
+
+
+def dec_packed(packed_list, sk):
+    """
+    Decrypts a list of packed numbers and unpacks their values
+    :param packed_list: List of packed numbers
+    :param sk: Secret Key
+    :return: The list of values
+    """
+    values = []
+    for packed in packed_list:
+        values.extend(packed.packing.unpack(dec(packed.ciphertext, sk, packed.packing.pk), packed.count))
+
+    return values
@@ -0,0 +1,143 @@
+import multiprocessing
+import queue
+import secrets
+
+from src.constants.const import POOL_CAPACITY
+from src.paillier import backend
+from src.paillier.paillier_fixed import get_table
+
+_pools = {}  # Obfuscator pools attached to a Public Key. They are indexed by the modulus of the ciphertexts
+
+
+def calc_obfuscator(n, n_2, n_s=None):
+    """
+    Calculates a new obfuscator r^(n^s) mod n^(s+1) with a random r
+    :param n: Modulus n from the Public Key
+    :param n_2: Modulus of the ciphertexts, n^2 for Paillier
+    :param n_s: Exponent n^s for Damgard-Jurik. n is used if it is not set
+    :return: The obfuscator r^(n^s) mod n^(s+1)
+    """
+    rdn = secrets.randbelow(n)  # Get a random value from 0 to n
+    return backend.powmod(rdn, n if n_s is None else n_s, n_2)
+
+
+def fill_pool(n, n_2, n_s, obf_queue):
+    """
+    Worker loop that fills the queue with obfuscators.
+    The put blocks while the queue is full, so the pool never exceeds its capacity
+    :param n: Modulus n from the Public Key
+    :param n_2: Modulus of the ciphertexts
+    :param n_s: Exponent of the obfuscators
+    :param obf_queue: Queue where the obfuscators are stored
+    :return:
+    """
+    while True:
+        obf_queue.put(calc_obfuscator(n, n_2, n_s))
+
+
+class ObfuscatorPool:
+    """
+    Pool of precomputed obfuscators r^n mod n^2 for a Public Key.
+    A background process fills the pool offline, so enc() only pays a modular multiplication online
+    """
+
+    def __init__(self, pk, capacity=POOL_CAPACITY):
+        self.n = pk.n
+        self.n_2 = pk.n_2
+        self.n_s = pk.n_s
+        self.capacity = capacity
+
+        # Counters to size the pool
+        self.hits = 0  # Obfuscators taken from the pool
+        self.misses = 0  # Obfuscators calculated online because the pool was empty
+
+        self.obf_queue = multiprocessing.Queue(capacity)
+        self.worker = None
+
+    def start(self):
+        """
+        Starts the background process that fills the pool
+        :return:
+        """
+        if self.worker is None:
+            self.worker = multiprocessing.Process(target=fill_pool,
+                                                  args=(self.n, self.n_2, self.n_s, self.obf_queue),
+                                                  daemon=True)
+            self.worker.start()
+
+    def stop(self):
+        """
+        Stops the background process. The obfuscators left in the pool are discarded
+        :return:
+        """
+        if self.worker is not None:
+            self.worker.terminate()
+            self.worker.join()
+            self.worker = None
+
+    def get(self):
+        """
+        Gets an obfuscator from the pool. If the pool is empty it is calculated online
+        :return: An obfuscator r^n mod n^2
+        """
+        try:
+            obf = self.obf_queue.get_nowait()
+            self.hits += 1
+        except queue.Empty:  # Pool empty - Calculate it online
+            obf = calc_obfuscator(self.n, self.n_2, self.n_s)
+            self.misses += 1
+        return obf
+
+    def stats(self):
+        """
+        Gets the counters of the pool
+        :return: The amount of hits and misses
+        """
+        return self.hits, self.misses
+
+
+def attach_pool(pk, capacity=POOL_CAPACITY):
+    """
+    Creates an obfuscator pool for the Public Key "pk" and starts filling it.
+    Every enc() with "pk" draws its obfuscator from the pool from now on
+    :param pk: Public Key
+    :param capacity: Maximum amount of obfuscators stored in the pool
+    :return: The pool created
+    """
+    detach_pool(pk)  # Only one pool per key
+
+    pool = ObfuscatorPool(pk, capacity)
+    pool.start()
+    _pools[pk.n_2] = pool
+
+    return pool
+
+
+def detach_pool(pk):
+    """
+    Stops and removes the obfuscator pool of the Public Key "pk"
+    :param pk: Public Key
+    :return:
+    """
+    pool = _pools.pop(pk.n_2, None)
+    if pool is not None:
+        pool.stop()
+
+
+def get_obfuscator(pk):
+    """
+    Gets an obfuscator r^n mod n^2 for the Public Key "pk".
+    It is taken from the pool of the key if it has one, otherwise from its fixed base table,
+    otherwise it is calculated
+    :param pk: Public Key
+    :return: An obfuscator r^n mod n^2
+    """
+    pool = _pools.get(pk.n_2)
+
+    if pool is None:  # No pool attached to the key
+        table = get_table(pk)
+        if table is not None:  # Short exponent of the fixed base
+            return table.get()
+        return calc_obfuscator(pk.n, pk.n_2, pk.n_s)
+
+    return pool.get()
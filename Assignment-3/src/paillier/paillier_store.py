@@ -0,0 +1,343 @@
+import base64
+import hashlib
+import os
+
+from src.constants.const import KEY_DIR, KEY_LEN, KEY_EXT, BUNDLE_DIR, BUNDLE_EXT, TABLE_DIR, TABLE_EXT
+from src.paillier.paillier import calc_r_list
+from src.paillier.paillier_fixed import FixedBaseTable
+from src.paillier.paillier_key import PublicKey, PrivateKey
+from src.paillier.paillier_material import SqpMaterial
+
+# Labels of the PEM-like blocks
+PK_LABEL = "PAILLIER PUBLIC KEY"
+SK_LABEL = "PAILLIER PRIVATE KEY"
+BUNDLE_LABEL = "SQP MATERIAL"
+TABLE_LABEL = "FIXED BASE TABLE"
+
+INT_LEN_BYTES = 4  # Bytes of the length prefix of each integer
+
+
+def int_to_bytes(num):
+    """
+    Encodes a non negative integer as big endian bytes with a length prefix
+    :param num: Integer to be encoded
+    :return: The length prefixed bytes
+    """
+    num = int(num)
+    num_b = num.to_bytes(max(1, (num.bit_length() + 7) // 8), "big")
+    return len(num_b).to_bytes(INT_LEN_BYTES, "big") + num_b
+
+
+def bytes_to_ints(data):
+    """
+    Decodes a sequence of length prefixed integers
+    :param data: Bytes with the integers
+    :return: A list with the integers decoded
+    """
+    ints = []
+    i = 0
+    while i < len(data):
+        num_len = int.from_bytes(data[i:i + INT_LEN_BYTES], "big")
+        i += INT_LEN_BYTES
+        ints.append(int.from_bytes(data[i:i + num_len], "big"))
+        i += num_len
+    return ints
+
+
+def to_pem(label, ints):
+    """
+    Encodes a list of integers into a PEM-like block
+    :param label: Label of the block
+    :param ints: List of integers
+    :return: The text of the block
+    """
+    data = base64.b64encode(b"".join(int_to_bytes(num) for num in ints)).decode("ascii")
+    lines = [data[i:i + 64] for i in range(0, len(data), 64)]  # 64 characters per line
+    return "-----BEGIN {}-----\n{}\n-----END {}-----\n".format(label, "\n".join(lines), label)
+
+
+def from_pem(label, text):
+    """
+    Decodes the integers of a PEM-like block
+    :param label: Label of the block
+    :param text: Text containing the block
+    :return: A list with the integers, None if there is no block with that label
+    """
+    blocks = from_pem_all(label, text)
+    return blocks[0] if blocks else None
+
+
+def from_pem_all(label, text):
+    """
+    Decodes the integers of all the PEM-like blocks with a label
+    :param label: Label of the blocks
+    :param text: Text containing the blocks
+    :return: A list with the list of integers of each block
+    """
+    begin = "-----BEGIN {}-----".format(label)
+    end = "-----END {}-----".format(label)
+
+    blocks = []
+    for data in text.split(begin)[1:]:
+        blocks.append(bytes_to_ints(base64.b64decode("".join(data.split(end)[0].split()))))
+    return blocks
+
+
+def key_fingerprint(pk):
+    """
+    Calculates a short fingerprint of a Public Key.
+    s is only hashed for Damgard-Jurik, so the Paillier fingerprints do not change
+    :param pk: Public Key
+    :return: The fingerprint as a hex string
+    """
+    n = int(pk.n)
+    data = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    if pk.s > 1:  # Keys with the same n and another s have another modulus
+        data += b"s" + pk.s.to_bytes(4, "big")
+
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def open_private(path):
+    """
+    Opens a file for writing that only the owner can read, from the moment it is created
+    :param path: Path of the file
+    :return: The file opened
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)  # The mode of os.open() is not applied to an existing file
+    return os.fdopen(fd, "w")
+
+
+def save_keys(path, pk, sk=None):
+    """
+    Saves the keys into a file. The private key is only saved if it is set
+    :param path: Path of the file
+    :param pk: Public Key
+    :param sk: Secret Key
+    :return:
+    """
+    text = to_pem(PK_LABEL, [pk.n, pk.g] + ([pk.s] if pk.s > 1 else []))  # s is only kept for Damgard-Jurik
+    if sk is not None:
+        text += to_pem(SK_LABEL, [sk.lamb, sk.mu, sk.p or 0, sk.q or 0, sk.hp or 0, sk.hq or 0, sk.q_inv or 0])
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    output_f = open_private(path) if sk is not None else open(path, "w")  # Only the owner can read the private key
+    with output_f:
+        output_f.write(text)
+
+
+def load_keys(path):
+    """
+    Loads the keys from a file
+    :param path: Path of the file
+    :return: The public and private keys. The private key is None if the file does not have it
+    """
+    with open(path) as input_f:
+        text = input_f.read()
+
+    pk_ints = from_pem(PK_LABEL, text)
+    if pk_ints is None:
+        raise ValueError("No public key found in {}".format(path))
+    pk = PublicKey(*pk_ints)
+
+    sk_ints = from_pem(SK_LABEL, text)
+    if sk_ints is None:  # Public key only
+        return pk, None
+
+    lamb, mu, p, q, hp, hq, q_inv = sk_ints
+    if p == 0:  # Key without the CRT values
+        return pk, PrivateKey(lamb, mu)
+
+    return pk, PrivateKey(lamb, mu, p, q, hp or None, hq or None, q_inv)  # Damgard-Jurik keys have no h
+
+
+def store_path(pk, key_len=KEY_LEN, key_dir=KEY_DIR):
+    """
+    Gets the path of a key inside the key store
+    :param pk: Public Key
+    :param key_len: Length of the key in bits
+    :param key_dir: Folder of the key store
+    :return: The path of the key file
+    """
+    return os.path.join(key_dir, "paillier_{}_{}{}".format(key_len, key_fingerprint(pk), KEY_EXT))
+
+
+def list_store(key_len=KEY_LEN, key_dir=KEY_DIR):
+    """
+    Lists the keys of a length saved in the key store
+    :param key_len: Length of the keys in bits
+    :param key_dir: Folder of the key store
+    :return: A sorted list with the paths of the keys
+    """
+    if not os.path.isdir(key_dir):
+        return []
+
+    prefix = "paillier_{}_".format(key_len)
+    return sorted(os.path.join(key_dir, f_name) for f_name in os.listdir(key_dir)
+                  if f_name.startswith(prefix) and f_name.endswith(KEY_EXT))
+
+
+def load_store_key(key_len=KEY_LEN, key_dir=KEY_DIR):
+    """
+    Loads a key of a length from the key store
+    :param key_len: Length of the key in bits
+    :param key_dir: Folder of the key store
+    :return: The public and private keys
+    """
+    paths = list_store(key_len, key_dir)
+    if not paths:
+        raise ValueError("No key of {} bits in the key store {}".format(key_len, key_dir))
+
+    return load_keys(paths[0])
+
+
+def material_to_ints(mat):
+    """
+    Flattens the material of a comparison into a list of integers
+    :param mat: Material of the comparison
+    :return: The list of integers
+    """
+    return ([mat.msg_len, mat.r, mat.length_enc, mat.r_enc, mat.enc_1, mat.enc_0, mat.final_obf] +
+            mat.r_encoded + mat.r_neg + mat.bit_enc[0] + mat.bit_enc[1])
+
+
+def ints_to_material(ints):
+    """
+    Builds the material of a comparison from a list of integers
+    :param ints: The list of integers from material_to_ints()
+    :return: The material of the comparison
+    """
+    msg_len, r, length_enc, r_enc, enc_1, enc_0, final_obf = ints[:7]
+    cts = [ints[7 + i * msg_len:7 + (i + 1) * msg_len] for i in range(4)]  # r_encoded, r_neg and bit_enc
+
+    return SqpMaterial(msg_len, r, calc_r_list(r, msg_len, 2 ** msg_len), length_enc, r_enc, enc_1, enc_0,
+                       cts[0], cts[1], [cts[2], cts[3]], final_obf)
+
+
+def save_bundles(path, pk, bundles):
+    """
+    Saves a list of precomputed comparison materials into a file
+    :param path: Path of the file
+    :param pk: Public Key used to calculate the materials
+    :param bundles: List of materials
+    :return:
+    """
+    fingerprint = int(key_fingerprint(pk), 16)  # Links the bundles to their key
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    with open_private(path) as output_f:  # The bundles hold the secret r of each comparison
+        for mat in bundles:
+            output_f.write(to_pem(BUNDLE_LABEL, [fingerprint] + material_to_ints(mat)))
+
+
+def load_bundles(path, pk):
+    """
+    Loads the precomputed comparison materials from a file
+    :param path: Path of the file
+    :param pk: Public Key the materials have to belong to
+    :return: A list of materials
+    """
+    with open(path) as input_f:
+        blocks = from_pem_all(BUNDLE_LABEL, input_f.read())
+
+    fingerprint = int(key_fingerprint(pk), 16)
+    if any(ints[0] != fingerprint for ints in blocks):  # Calculated with another key
+        raise ValueError("The bundles of {} do not belong to the key used".format(path))
+
+    return [ints_to_material(ints[1:]) for ints in blocks]
+
+
+def take_bundle(path, pk, msg_len):
+    """
+    Takes a material of at least "msg_len" bits out of a bundle file. A material can only be used by one
+    comparison, so the file is rewritten without it before it is returned
+    :param path: Path of the file
+    :param pk: Public Key the materials have to belong to
+    :param msg_len: Length of the compared messages
+    :return: The material, None if the file has no material with enough bits
+    """
+    bundles = load_bundles(path, pk)
+
+    # Any bundle with enough bits is valid
+    idx = next((i for i, mat in enumerate(bundles) if mat.msg_len >= msg_len), None)
+    if idx is None:
+        return None
+
+    mat = bundles.pop(idx)
+
+    # The file is replaced at once, so an interrupted write can not keep the spent material
+    save_bundles(path + ".tmp", pk, bundles)
+    os.replace(path + ".tmp", path)
+
+    return mat
+
+
+def bundle_path(pk, msg_len, bundle_dir=BUNDLE_DIR):
+    """
+    Gets the path of the bundle file for a key and a message length
+    :param pk: Public Key
+    :param msg_len: Length of the compared messages
+    :param bundle_dir: Folder of the bundles
+    :return: The path of the bundle file
+    """
+    return os.path.join(bundle_dir, "sqp_{}_{}{}".format(key_fingerprint(pk), msg_len, BUNDLE_EXT))
+
+
+def save_table(path, pk, table):
+    """
+    Saves a fixed base table into a file
+    :param path: Path of the file
+    :param pk: Public Key of the table
+    :param table: Fixed base table
+    :return:
+    """
+    fingerprint = int(key_fingerprint(pk), 16)  # Links the table to its key
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    with open(path, "w") as output_f:
+        output_f.write(to_pem(TABLE_LABEL, [fingerprint, table.h_s, table.exp_bits, table.window] +
+                              [entry for row in table.rows for entry in row[1:]]))  # The entries of 0 are 1
+
+
+def load_table(path, pk):
+    """
+    Loads a fixed base table from a file
+    :param path: Path of the file
+    :param pk: Public Key the table has to belong to
+    :return: The fixed base table
+    """
+    with open(path) as input_f:
+        ints = from_pem(TABLE_LABEL, input_f.read())
+
+    if ints is None:
+        raise ValueError("No fixed base table found in {}".format(path))
+
+    if ints[0] != int(key_fingerprint(pk), 16):  # Calculated with another key
+        raise ValueError("The table of {} does not belong to the key used".format(path))
+
+    h_s, exp_bits, window = ints[1:4]
+    row_len = 2 ** window - 1
+    rows = [[1] + ints[i:i + row_len] for i in range(4, len(ints), row_len)]
+
+    return FixedBaseTable(pk.n_2, h_s, exp_bits, window, rows)
+
+
+def table_path(pk, window, table_dir=TABLE_DIR):
+    """
+    Gets the path of the fixed base table file for a key and a window
+    :param pk: Public Key
+    :param window: Bits of the exponent covered by each row
+    :param table_dir: Folder of the tables
+    :return: The path of the table file
+    """
+    return os.path.join(table_dir, "fixed_{}_{}{}".format(key_fingerprint(pk), window, TABLE_EXT))
@@ -0,0 +1,345 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from src.constants.const import VEC_CHUNK, VEC_STRAUS_MAX, VEC_STRAUS_WINDOW
+from src.paillier import backend
+from src.paillier.paillier import enc, dec, batch_inv
+from src.paillier.paillier_batch import enc_many, dec_many
+from src.paillier.paillier_number import EncryptedNumber, get_context
+
+
+def prod_mod(values, n_2):
+    """
+    Multiplies a list of ciphertexts: [a_1] + ... + [a_k]
+    :param values: List of ciphertexts
+    :param n_2: Modulus of the ciphertexts
+    :return: The product modulus n^2
+    """
+    result = 1
+    for val in values:
+        result = backend.mulmod(result, val, n_2)
+    return result
+
+
+def straus(bases, exps, n_2, window=VEC_STRAUS_WINDOW):
+    """
+    Calculates prod b_i^e_i mod n^2 with Straus' interleaved windows.
+    Every base has a table of its first 2^window powers and all of them share the squarings
+    :param bases: List of bases
+    :param exps: List of non negative exponents
+    :param n_2: Modulus
+    :param window: Bits of the exponents processed at once
+    :return: The product of the powers
+    """
+    bits = max(exps, default=0).bit_length()
+    mask = 2 ** window - 1
+
+    tables = []
+    for base in bases:
+        table = [1, base]
+        for _ in range(mask - 1):
+            table.append(backend.mulmod(table[-1], base, n_2))
+        tables.append(table)
+
+    result = 1
+    for shift in range(window * (-(-bits // window) - 1), -1, -window):  # From the most significant window
+        if result != 1:
+            for _ in range(window):
+                result = backend.mulmod(result, result, n_2)
+
+        for table, exp in zip(tables, exps):
+            digit = (exp >> shift) & mask
+            if digit:
+                result = backend.mulmod(result, table[digit], n_2)
+
+    return result
+
+
+def pippenger(bases, exps, n_2):
+    """
+    Calculates prod b_i^e_i mod n^2 with Pippenger's buckets.
+    For each window of c bits the bases are multiplied into the bucket of their digit, and the buckets are
+    combined with running products, so each window costs about len(bases) + 2^(c+1) multiplications
+    :param bases: List of bases
+    :param exps: List of non negative exponents
+    :param n_2: Modulus
+    :return: The product of the powers
+    """
+    bits = max(exps, default=0).bit_length()
+    if bits == 0:
+        return 1
+
+    log_n = len(bases).bit_length()
+    c = max(1, min(bits, log_n - log_n.bit_length()))  # About log2(k) - log2(log2(k)) bits per window
+    mask = 2 ** c - 1
+
+    result = 1
+    for shift in range(c * (-(-bits // c) - 1), -1, -c):  # From the most significant window
+        if result != 1:
+            for _ in range(c):
+                result = backend.mulmod(result, result, n_2)
+
+        buckets = [None] * (mask + 1)
+        for base, exp in zip(bases, exps):
+            digit = (exp >> shift) & mask
+            if digit:
+                bucket = buckets[digit]
+                buckets[digit] = base if bucket is None else backend.mulmod(bucket, base, n_2)
+
+        # sum_j j * B_j = B_max + (B_max + B_max-1) + ... with running products
+        running = None
+        total = None
+        for bucket in reversed(buckets[1:]):
+            if bucket is not None:
+                running = bucket if running is None else backend.mulmod(running, bucket, n_2)
+            if running is not None:
+                total = running if total is None else backend.mulmod(total, running, n_2)
+
+        if total is not None:
+            result = backend.mulmod(result, total, n_2)
+
+    return result
+
+
+def multi_exp(bases, exps, n_2):
+    """
+    Calculates prod b_i^e_i mod n^2 with Straus for a few bases and Pippenger for many
+    :param bases: List of bases
+    :param exps: List of non negative exponents
+    :param n_2: Modulus
+    :return: The product of the powers
+    """
+    if len(bases) <= VEC_STRAUS_MAX:
+        return straus(bases, exps, n_2)
+
+    return pippenger(bases, exps, n_2)
+
+
+def signed_multi_exp(bases, weights, n_2):
+    """
+    Calculates prod b_i^w_i mod n^2 for signed weights.
+    The negative weights go into a second multi exponentiation which is inverted once,
+    so the exponents stay as short as the weights instead of growing to n
+    :param bases: List of ciphertexts
+    :param weights: List of weights, already reduced to the range (-n^s / 2, n^s / 2]
+    :param n_2: Modulus of the ciphertexts
+    :return: The product of the powers
+    """
+    pos = [(base, w) for base, w in zip(bases, weights) if w > 0]
+    neg = [(base, -w) for base, w in zip(bases, weights) if w < 0]
+
+    result = multi_exp([b for b, _ in pos], [w for _, w in pos], n_2)
+    if neg:
+        neg_result = backend.invert(multi_exp([b for b, _ in neg], [w for _, w in neg], n_2), n_2)
+        if neg_result is None:
+            raise ValueError("Ciphertext not invertible modulus n^2")
+        result = backend.mulmod(result, neg_result, n_2)
+
+    return result
+
+
+def prod_worker(args):
+    """
+    Multiplies a chunk of ciphertexts in a worker process
+    :param args: The chunk of ciphertexts and the modulus
+    :return: The product modulus n^2
+    """
+    values, n_2 = args
+    return prod_mod(values, n_2)
+
+
+def dot_worker(args):
+    """
+    Calculates the dot product of a chunk in a worker process
+    :param args: The chunk of ciphertexts, the chunk of weights and the modulus
+    :return: The product of the powers
+    """
+    bases, weights, n_2 = args
+    return signed_multi_exp(bases, weights, n_2)
+
+
+def scale_worker(args):
+    """
+    Multiplies a chunk of ciphertexts by a scalar in a worker process
+    :param args: The chunk of ciphertexts, the scalar and the modulus
+    :return: The list of ciphertexts multiplied
+    """
+    values, scalar, n_2 = args
+    return [backend.powmod(val, scalar, n_2) for val in values]
+
+
+def map_chunks(worker, tasks, workers):
+    """
+    Runs a worker function over the chunks with a pool of processes
+    :param worker: Function run for each chunk
+    :param tasks: List with the arguments of each chunk
+    :param workers: Amount of worker processes. None uses all the cores
+    :return: A list with the results in the order of the chunks
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(worker, tasks))
+
+
+class EncryptedVector:
+    """
+    Vector of Paillier ciphertexts bound to one key context.
+    Adding two vectors or a list of ints operates element by element, multiplying by an int scales every element,
+    sum() adds all the elements and dot() calculates the dot product with a vector of plain text weights
+    with a multi exponentiation. Vectors longer than VEC_CHUNK are split among worker processes
+    when workers is not 1
+    """
+    __slots__ = ("ctx", "ciphertexts", "workers")
+
+    def __init__(self, ctx, ciphertexts, workers=1):
+        self.ctx = ctx
+        self.ciphertexts = ciphertexts
+        self.workers = workers  # Amount of worker processes. 1 runs everything in this process
+
+    def chunks(self):
+        """
+        Checks if the vector has to be split among worker processes
+        :return: A list with the start of each chunk, None if it runs in this process
+        """
+        if self.workers == 1 or len(self.ciphertexts) <= VEC_CHUNK:
+            return None
+        return list(range(0, len(self.ciphertexts), VEC_CHUNK))
+
+    def check_len(self, other):
+        """
+        Checks that another vector or list has the same length
+        :param other: Encrypted vector or list of ints
+        :return:
+        """
+        if len(other) != len(self.ciphertexts):
+            raise ValueError("Vectors of different lengths: {} and {}".format(len(self.ciphertexts), len(other)))
+
+    def signed(self, weight):
+        """
+        Reduces a weight to the range (-n^s / 2, n^s / 2]
+        :param weight: Plain text weight
+        :return: The reduced weight
+        """
+        weight %= self.ctx.n_s
+        return weight - self.ctx.n_s if weight > self.ctx.n_s // 2 else weight
+
+    def __len__(self):
+        return len(self.ciphertexts)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return EncryptedVector(self.ctx, self.ciphertexts[idx], self.workers)
+        return EncryptedNumber(self.ctx, self.ciphertexts[idx])
+
+    def __add__(self, other):
+        ctx = self.ctx
+        self.check_len(other)
+
+        if isinstance(other, EncryptedVector):  # [a_i] + [b_i]
+            return EncryptedVector(ctx, [backend.mulmod(c_1, c_2, ctx.n_2)
+                                         for c_1, c_2 in zip(self.ciphertexts, other.ciphertexts)], self.workers)
+
+        # [a_i] + b_i
+        return EncryptedVector(ctx, [backend.mulmod(c_1, ctx.g_m(val), ctx.n_2)
+                                     for c_1, val in zip(self.ciphertexts, other)], self.workers)
+
+    def __radd__(self, other):
+        if isinstance(other, int) and other == 0:  # Start value of sum()
+            return self
+        return self.__add__(other)
+
+    def negated(self):
+        """
+        Negates all the elements with a single inversion instead of one per element.
+        The negations do not go through the cache of the key context, so long vectors do not wipe it
+        :return: A list with the negated ciphertexts
+        """
+        return batch_inv(self.ciphertexts, self.ctx.n_2)  # [m]^-1 = [-m]
+
+    def __neg__(self):
+        return EncryptedVector(self.ctx, self.negated(), self.workers)
+
+    def __sub__(self, other):
+        if isinstance(other, EncryptedVector):  # [a_i] - [b_i]
+            return self + (-other)
+
+        return self + [-val for val in other]  # [a_i] - b_i
+
+    def __mul__(self, scalar):
+        ctx = self.ctx
+        scalar = self.signed(scalar)
+        values = self.ciphertexts if scalar >= 0 else self.negated()
+        scalar = abs(scalar)  # Short exponent for small negative scalars
+
+        starts = self.chunks()
+        if starts is None:
+            return EncryptedVector(ctx, [backend.powmod(c_1, scalar, ctx.n_2) for c_1 in values], self.workers)
+
+        results = map_chunks(scale_worker, [(values[i:i + VEC_CHUNK], scalar, ctx.n_2) for i in starts], self.workers)
+        return EncryptedVector(ctx, [c_1 for chunk in results for c_1 in chunk], self.workers)
+
+    __rmul__ = __mul__
+
+    def sum(self):
+        """
+        Adds all the elements of the vector
+        :return: The encrypted sum
+        """
+        ctx = self.ctx
+        starts = self.chunks()
+
+        if starts is None:
+            return EncryptedNumber(ctx, prod_mod(self.ciphertexts, ctx.n_2))
+
+        partial = map_chunks(prod_worker, [(self.ciphertexts[i:i + VEC_CHUNK], ctx.n_2) for i in starts],
+                             self.workers)
+        return EncryptedNumber(ctx, prod_mod(partial, ctx.n_2))
+
+    def dot(self, weights):
+        """
+        Calculates the dot product with a vector of plain text weights: sum_i w_i * [a_i]
+        :param weights: List of weights. Negative weights are supported
+        :return: The encrypted dot product
+        """
+        ctx = self.ctx
+        self.check_len(weights)
+        weights = [self.signed(w) for w in weights]
+
+        starts = self.chunks()
+        if starts is None:
+            return EncryptedNumber(ctx, signed_multi_exp(self.ciphertexts, weights, ctx.n_2))
+
+        partial = map_chunks(dot_worker, [(self.ciphertexts[i:i + VEC_CHUNK], weights[i:i + VEC_CHUNK], ctx.n_2)
+                                          for i in starts], self.workers)
+        return EncryptedNumber(ctx, prod_mod(partial, ctx.n_2))
+
+    def __repr__(self):
+        return "EncryptedVector({} elements)".format(len(self.ciphertexts))
+
+
+def enc_vector(values, pk, workers=1):
+    """
+    Encrypts a list of values into an encrypted vector
+    :param values: List of values
+    :param pk: Public Key
+    :param workers: Amount of worker processes. 1 runs everything in this process, None uses all the cores
+    :return: The encrypted vector
+    """
+    if workers == 1:
+        ciphertexts = [enc(val, pk) for val in values]
+    else:
+        ciphertexts = enc_many(values, pk, workers)
+
+    return EncryptedVector(get_context(pk), ciphertexts, workers)
+
+
+def dec_vector(vector, sk, pk):
+    """
+    Decrypts an encrypted vector
+    :param vector: Encrypted vector
+    :param sk: Secret Key
+    :param pk: Public Key
+    :return: The list of values
+    """
+    if vector.workers == 1:
+        return [dec(c_1, sk, pk) for c_1 in vector.ciphertexts]
+
+    return dec_many(vector.ciphertexts, sk, pk, vector.workers)
@@ -0,0 +1,59 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.constants.const import BATCH_WORKERS
+from src.paillier.paillier import calc_shared, calc_material, sqp
+
+# Values of the worker process. They are set once per worker by init_sqp_worker()
+_worker_pk = None
+_worker_sk = None
+_worker_shared = None
+
+
+def init_sqp_worker(pk, sk, shared):
+    """
+    Initializer of the worker processes. Stores the keys and the shared public constants
+    so they are not sent with every comparison
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param shared: Public constants of the comparisons, from calc_shared()
+    :return:
+    """
+    global _worker_pk, _worker_sk, _worker_shared
+    _worker_pk = pk
+    _worker_sk = sk
+    _worker_shared = shared
+
+
+def sqp_worker(num1, num2, msg_len):
+    """
+    Performs a Secure Comparison Protocol in a worker, with its own r, bit encryptions and final obfuscator
+    :param num1: First encrypted number to be compared
+    :param num2: Second encrypted number to be compared
+    :param msg_len: Length of the original messages
+    :return: The result of the comparison
+    """
+    mat = calc_material(_worker_pk, msg_len, _worker_shared)
+    return sqp(num1, num2, _worker_pk, _worker_sk, msg_len, mat)
+
+
+def sqp_many(pairs, pk, sk, msg_len, workers=BATCH_WORKERS):
+    """
+    Performs the Secure Comparison Protocol for many pairs of encrypted numbers.
+    Only the public constants [2^l], [1] and [0] are encrypted once for the whole batch. Each comparison
+    draws its own material, as a shared r would reveal the differences between the compared pairs.
+    The comparisons run in parallel in a pool of processes
+    :param pairs: List with the pairs of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param workers: Amount of worker processes. None uses all the cores
+    :return: A generator of (index of the pair, result) in the order the comparisons finish
+    """
+    shared = calc_shared(pk, msg_len)  # Public constants shared by all the comparisons
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_sqp_worker, initargs=(pk, sk, shared)) as executor:
+        futures = {executor.submit(sqp_worker, num1, num2, msg_len): idx for idx, (num1, num2) in enumerate(pairs)}
+
+        # Stream the results as they finish
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
@@ -0,0 +1,377 @@
+import asyncio
+import math
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from src.constants.const import SEC_PARAM, FRAME_LEN_BYTES, NET_PIPELINE
+from src.paillier import backend
+from src.paillier.paillier import enc, dec, as_number, calc_z, calc_c, calc_c_list, gen_e_list, check_e
+from src.paillier.paillier_store import int_to_bytes, bytes_to_ints
+
+# Types of the messages
+MSG_C = 1  # Evaluator: l and [c]
+MSG_BITS = 2  # Key holder: [d div 2^l] and the bits of d encrypted
+MSG_E = 3  # Evaluator: the e values in a random order
+MSG_LAMBDA = 4  # Key holder: [lambda]
+MSG_Z = 5  # Evaluator: [z_l]
+MSG_RESULT = 6  # Key holder: the result of the comparison
+MSG_CLOSE = 7  # Evaluator: no more comparisons
+
+# Keys of the key holder process. They are set once by init_key_holder()
+_holder_pk = None
+_holder_sk = None
+
+
+class NetStats:
+    """
+    Counters of the traffic of a channel
+    """
+    __slots__ = ("bytes_sent", "bytes_received", "messages_sent", "messages_received", "round_trips")
+
+    def __init__(self):
+        self.bytes_sent = 0  # Bytes written, with the framing
+        self.bytes_received = 0  # Bytes read, with the framing
+        self.messages_sent = 0  # Frames written
+        self.messages_received = 0  # Frames read
+        self.round_trips = 0  # Requests answered by the other party
+
+    def total_bytes(self):
+        """
+        Bytes sent in both directions
+        :return: The amount of bytes
+        """
+        return self.bytes_sent + self.bytes_received
+
+
+class MemoryWriter:
+    """
+    Writer end of an in memory pipe. It feeds the bytes to the reader of the other end, after "delay" seconds
+    to simulate the latency of a network
+    """
+    __slots__ = ("reader", "delay")
+
+    def __init__(self, reader, delay=0):
+        self.reader = reader
+        self.delay = delay
+
+    def write(self, data):
+        if self.delay > 0:
+            asyncio.get_running_loop().call_later(self.delay, self.reader.feed_data, data)
+        else:
+            self.reader.feed_data(data)
+
+    async def drain(self):
+        await asyncio.sleep(0)  # Let the other end run
+
+    def close(self):
+        if self.delay > 0:  # After the data in flight
+            asyncio.get_running_loop().call_later(self.delay, self.reader.feed_eof)
+        else:
+            self.reader.feed_eof()
+
+    async def wait_closed(self):
+        return
+
+
+class Channel:
+    """
+    Length prefixed frames over an asyncio stream: [body length][comparison id][type][integers]
+    """
+    __slots__ = ("reader", "writer", "stats")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.stats = NetStats()
+
+    async def send(self, cid, msg_type, ints):
+        """
+        Sends a frame
+        :param cid: Id of the comparison
+        :param msg_type: Type of the message
+        :param ints: List of integers, usually ciphertexts
+        :return:
+        """
+        body = cid.to_bytes(4, "big") + msg_type.to_bytes(1, "big") + b"".join(int_to_bytes(i) for i in ints)
+        frame = len(body).to_bytes(FRAME_LEN_BYTES, "big") + body
+
+        self.writer.write(frame)
+        await self.writer.drain()
+
+        self.stats.bytes_sent += len(frame)
+        self.stats.messages_sent += 1
+
+    async def recv(self):
+        """
+        Receives a frame
+        :return: The id of the comparison, the type of the message and the list of integers
+        """
+        body_len = int.from_bytes(await self.reader.readexactly(FRAME_LEN_BYTES), "big")
+        body = await self.reader.readexactly(body_len)
+
+        self.stats.bytes_received += FRAME_LEN_BYTES + body_len
+        self.stats.messages_received += 1
+
+        return int.from_bytes(body[:4], "big"), body[4], bytes_to_ints(body[5:])
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def memory_pipe(delay=0):
+    """
+    Creates the two ends of an in memory pipe
+    :param delay: One way latency in seconds
+    :return: The channels of both ends
+    """
+    reader_1, reader_2 = asyncio.StreamReader(), asyncio.StreamReader()
+
+    return Channel(reader_1, MemoryWriter(reader_2, delay)), Channel(reader_2, MemoryWriter(reader_1, delay))
+
+
+def init_key_holder(pk, sk, backend_name):
+    """
+    Initializer of the key holder process. Stores the keys so they are not sent with every message
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param backend_name: Arithmetic backend of the parent process
+    :return:
+    """
+    global _holder_pk, _holder_sk
+    _holder_pk = pk
+    _holder_sk = sk
+    backend.set_backend(backend_name)
+
+
+def key_holder_answer(msg_type, ints):
+    """
+    Calculates the answer of the key holder to a message of the evaluator
+    :param msg_type: Type of the message
+    :param ints: Integers of the message
+    :return: The type and the integers of the answer
+    """
+    pk, sk = _holder_pk, _holder_sk
+
+    if msg_type == MSG_C:  # [d div 2^l] and the bits of d
+        msg_len, c = ints
+        d_l = enc(dec(c, sk, pk) >> msg_len, pk)
+
+        c_encrypt = calc_c_list(c, sk, pk, msg_len, 2 ** msg_len)
+        return MSG_BITS, [int(d_l)] + [int(c_i) for c_i in c_encrypt]
+
+    if msg_type == MSG_E:  # [lambda], 1 if one of the blinded e values is zero
+        return MSG_LAMBDA, [int(enc(check_e(ints, pk, sk), pk))]
+
+    if msg_type == MSG_Z:  # Result of the comparison
+        return MSG_RESULT, [dec(ints[0], sk, pk)]
+
+    raise ValueError("Unknown message type {}".format(msg_type))
+
+
+async def serve_key_holder(channel, pk, sk):
+    """
+    Answers the messages of the evaluator until it closes the channel.
+    Every message carries all the key holder needs, so the messages of different comparisons can be interleaved.
+    The answers are calculated in a process of the key holder, so its work overlaps with the work of the evaluator
+    :param channel: Channel with the evaluator
+    :param pk: Public Key
+    :param sk: Secret Key
+    :return:
+    """
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def answer(cid, msg_type, ints):
+        reply_type, reply = await loop.run_in_executor(executor, key_holder_answer, msg_type, ints)
+        await channel.send(cid, reply_type, reply)
+
+    with ProcessPoolExecutor(max_workers=1, initializer=init_key_holder, initargs=(pk, sk, backend.name)) as executor:
+        while True:
+            try:
+                cid, msg_type, ints = await channel.recv()
+            except asyncio.IncompleteReadError:  # Channel closed
+                break
+
+            if msg_type == MSG_CLOSE:
+                break
+
+            task = asyncio.ensure_future(answer(cid, msg_type, ints))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:  # Answers still being calculated
+            await asyncio.gather(*pending)
+
+
+def blind_e(e_i, pk):
+    """
+    Blinds an e value: [e_i * s_i] = [e_i]^s_i with a random s_i of Z_n*.
+    A zero stays zero, and any other value becomes a random one, which hides the bits of r
+    :param e_i: Encrypted e value
+    :param pk: Public Key
+    :return: The blinded e value
+    """
+    s_i = 0
+    while math.gcd(s_i, pk.n) != 1:  # Random element of Z_n*
+        s_i = secrets.randbelow(pk.n)
+
+    return int(backend.powmod(int(e_i), s_i, pk.n_2))
+
+
+class Evaluator:
+    """
+    Evaluator end of the protocol. It holds the encrypted numbers and runs many comparisons over one channel
+    """
+    __slots__ = ("channel", "pk", "queues", "listener")
+
+    def __init__(self, channel, pk):
+        self.channel = channel
+        self.pk = pk
+        self.queues = {}  # Comparison id -> queue with its messages
+        self.listener = None
+
+    async def listen(self):
+        """
+        Dispatches the incoming messages to the comparison they belong to
+        :return:
+        """
+        try:
+            while True:
+                cid, msg_type, ints = await self.channel.recv()
+                self.queues[cid].put_nowait((msg_type, ints))
+        except asyncio.IncompleteReadError:  # Channel closed
+            return
+
+    async def request(self, cid, msg_type, ints, reply_type):
+        """
+        Sends a message of a comparison and waits for the answer
+        :param cid: Id of the comparison
+        :param msg_type: Type of the message sent
+        :param ints: Integers of the message
+        :param reply_type: Type of the message expected
+        :return: The integers of the answer
+        """
+        await self.channel.send(cid, msg_type, ints)
+        got_type, reply = await self.queues[cid].get()
+        self.channel.stats.round_trips += 1
+
+        if got_type != reply_type:
+            raise ValueError("Expected message {}, got {}".format(reply_type, got_type))
+        return reply
+
+    async def compare(self, cid, num1, num2, msg_len):
+        """
+        Runs one Secure Comparison Protocol with the key holder
+        :param cid: Id of the comparison, unique in the channel
+        :param num1: First encrypted number to be compared
+        :param num2: Second encrypted number to be compared
+        :param msg_len: Length of the original messages
+        :return: 1 if num1 >= num2, otherwise 0
+        """
+        pk = self.pk
+        two_to_l = 2 ** msg_len
+        self.queues[cid] = asyncio.Queue()
+
+        # Round 1: [c] = [z] + [r]
+        c, r = calc_c(calc_z(num1, num2, pk, two_to_l), msg_len, SEC_PARAM, pk)
+        reply = await self.request(cid, MSG_C, [msg_len, int(c)], MSG_BITS)
+        d_l, c_encrypt = reply[0], reply[1:]
+
+        # Round 2: the e values, each one multiplied by a random s_i so the key holder only learns if there is a zero
+        e_list = [blind_e(e_i, pk) for e_i in gen_e_list(r, c_encrypt, pk, msg_len, two_to_l)]
+        lamb = (await self.request(cid, MSG_E, e_list, MSG_LAMBDA))[0]
+
+        # Round 3: [z_l] = [d div 2^l] - (r div 2^l) - [lambda]
+        z_l = as_number(d_l, pk) - (r >> msg_len) - as_number(lamb, pk)
+        result = (await self.request(cid, MSG_Z, [int(z_l)], MSG_RESULT))[0]
+
+        del self.queues[cid]
+        return result
+
+    async def compare_many(self, pairs, msg_len, pipeline=NET_PIPELINE):
+        """
+        Runs many comparisons over the channel, with up to "pipeline" of them in flight at once
+        :param pairs: List with the pairs of encrypted numbers
+        :param msg_len: Length of the original messages
+        :param pipeline: Maximum amount of comparisons in flight
+        :return: A list with the results, in the order of the pairs
+        """
+        if self.listener is None:
+            self.listener = asyncio.ensure_future(self.listen())
+
+        slots = asyncio.Semaphore(pipeline)
+
+        async def run(cid, num1, num2):
+            async with slots:
+                return await self.compare(cid, num1, num2, msg_len)
+
+        return await asyncio.gather(*[run(cid, num1, num2) for cid, (num1, num2) in enumerate(pairs)])
+
+    async def close(self):
+        """
+        Tells the key holder that there are no more comparisons and closes the channel
+        :return:
+        """
+        await self.channel.send(0, MSG_CLOSE, [])
+        if self.listener is not None:
+            self.listener.cancel()
+        await self.channel.close()
+
+
+async def run_memory(pairs, pk, sk, msg_len, pipeline=NET_PIPELINE, delay=0):
+    """
+    Runs the comparisons between an evaluator and a key holder joined by an in memory pipe
+    :param pairs: List with the pairs of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param pipeline: Maximum amount of comparisons in flight
+    :param delay: One way latency of the pipe in seconds
+    :return: The results and the traffic stats of the evaluator
+    """
+    eval_end, key_end = memory_pipe(delay)
+    server = asyncio.ensure_future(serve_key_holder(key_end, pk, sk))
+
+    evaluator = Evaluator(eval_end, pk)
+    results = await evaluator.compare_many(pairs, msg_len, pipeline)
+    await evaluator.close()
+    await server
+
+    return results, eval_end.stats
+
+
+async def run_tcp(pairs, pk, sk, msg_len, pipeline=NET_PIPELINE, host="127.0.0.1", port=0):
+    """
+    Runs the comparisons between an evaluator and a key holder joined by a TCP connection
+    :param pairs: List with the pairs of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param pipeline: Maximum amount of comparisons in flight
+    :param host: Address of the key holder
+    :param port: Port of the key holder. 0 takes a free one
+    :return: The results and the traffic stats of the evaluator
+    """
+    served = asyncio.Event()
+
+    async def handle(reader, writer):
+        await serve_key_holder(Channel(reader, writer), pk, sk)
+        writer.close()
+        served.set()
+
+    server = await asyncio.start_server(handle, host, port)
+    port = server.sockets[0].getsockname()[1]
+
+    reader, writer = await asyncio.open_connection(host, port)
+    eval_end = Channel(reader, writer)
+
+    evaluator = Evaluator(eval_end, pk)
+    results = await evaluator.compare_many(pairs, msg_len, pipeline)
+    await evaluator.close()
+
+    await served.wait()
+    server.close()
+    await server.wait_closed()
+
+    return results, eval_end.stats
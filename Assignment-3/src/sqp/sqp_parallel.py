@@ -0,0 +1,167 @@
+import multiprocessing
+import secrets
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.constants.const import E_CHUNK
+from src.paillier import backend
+from src.paillier.paillier import enc, calc_r_list, calc_e_bits, calc_e_i, is_zero
+from src.sqp.sqp_stats import sqp_stats
+
+_pools = {}  # Pools of processes already created. They are indexed by (n, workers)
+
+# Values of the worker process. They are set once per worker by init_e_worker()
+_worker_pk = None
+_worker_sk = None
+_worker_job = None
+
+
+def init_e_worker(pk, sk, job):
+    """
+    Initializer of the worker processes. Stores the keys and the shared job id used to cancel the work
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param job: Shared value with the id of the comparison running. It is set to 0 to cancel it
+    :return:
+    """
+    global _worker_pk, _worker_sk, _worker_job
+    _worker_pk = pk
+    _worker_sk = sk
+    _worker_job = job
+
+
+def e_bits_worker(c_chunk, r_chunk, r_enc_chunk, r_neg_chunk):
+    """
+    Calculates the values of a run of consecutive bits shared by their e values in a worker
+    :param c_chunk: List with the values from c encrypted of the bits
+    :param r_chunk: List with the bits of r
+    :param r_enc_chunk: List of [r_i]. The bits are encrypted here if it is not set
+    :param r_neg_chunk: List of [-r_i]. They are calculated here if it is not set
+    :return: The list of [-r_i], the list of sums of the xor of the bits above each bit inside the run
+    and the sum of the xor of the whole run
+    """
+    if r_enc_chunk is None:  # No precomputed material
+        r_enc_chunk = [enc(r_i, _worker_pk) for r_i in r_chunk]
+
+    return calc_e_bits(c_chunk, r_chunk, r_enc_chunk, r_neg_chunk, 1, _worker_pk)  # 1 is a trivial [0]
+
+
+def e_chunk_worker(job_id, enc_1, chunk):
+    """
+    Calculates and checks a chunk of e values in a worker
+    :param job_id: Id of the comparison
+    :param enc_1: [1]
+    :param chunk: List of ([c_i], [-r_i], sum of the xor above i inside its run, sum of the xor of the runs above)
+    for the e values of the chunk
+    :return: True if a zero is found, and the amount of e values checked
+    """
+    checked = 0
+    for c_i, r_neg_i, run_sum_i, above_i in chunk:
+        if _worker_job.value != job_id:  # Comparison cancelled - A zero was found in other chunk
+            break
+
+        sum_i = backend.mulmod(run_sum_i, above_i, _worker_pk.n_2)  # sum_{j > i} xor_j
+        e_i = calc_e_i(0, [c_i], enc_1, [r_neg_i], [sum_i], _worker_pk)
+        checked += 1
+
+        if is_zero(e_i, _worker_sk, _worker_pk):  # r larger than c
+            return True, checked
+
+    return False, checked
+
+
+def get_e_pool(pk, sk, workers):
+    """
+    Gets the pool of processes for a key. It is only created the first time, so the keys are sent once
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param workers: Amount of worker processes
+    :return: The pool of processes and the shared job id
+    """
+    pool = _pools.get((pk.n, workers))
+
+    if pool is None:
+        job = multiprocessing.Value("q", 0)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_e_worker, initargs=(pk, sk, job))
+        pool = (executor, job)
+        _pools[(pk.n, workers)] = pool
+
+    return pool
+
+
+def close_e_pools():
+    """
+    Shuts down all the pools of processes
+    :return:
+    """
+    for executor, _ in _pools.values():
+        executor.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+def check_e_parallel(r, c_encrypt, pk, sk, msg_len, two_to_l, mat=None, workers=2):
+    """
+    Calculates the e values and checks if any of them is zero, splitting the work across a pool of processes.
+    Each worker first calculates the xor and the suffix sums of a run of consecutive bits, encrypting the bits of r
+    if there is no material. This process only adds up the sums of the runs, one operation per run, and then the
+    workers calculate and check the e values. The outstanding work is cancelled as soon as a zero is found
+    :param r: Value r
+    :param c_encrypt: List with the values from c encrypted
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original message
+    :param two_to_l: 2^l
+    :param mat: Precomputed material of the comparison. It is calculated if it is not set
+    :param workers: Amount of worker processes
+    :return: 1 if there is a zero, otherwise 0
+    """
+    if mat is None:
+        r_list, enc_1, enc_0 = calc_r_list(r, msg_len, two_to_l), enc(1, pk), enc(0, pk)
+        r_encoded = r_neg = None  # Encrypted by the workers
+    else:  # Precomputed values
+        r_list, enc_1, enc_0, r_encoded, r_neg = mat.r_list, mat.enc_1, mat.enc_0, mat.r_encoded, mat.r_neg
+
+    executor, job = get_e_pool(pk, sk, workers)
+
+    # One run of consecutive bits per worker
+    run_len = -(-len(c_encrypt) // workers)
+    starts = list(range(0, len(c_encrypt), run_len))
+    run_futures = [executor.submit(e_bits_worker, c_encrypt[k:k + run_len], r_list[k:k + run_len],
+                                   None if r_encoded is None else r_encoded[k:k + run_len],
+                                   None if r_neg is None else r_neg[k:k + run_len]) for k in starts]
+    runs = [fut.result() for fut in run_futures]
+
+    # Sum of the xor of the runs above each run, starting from [0]
+    above_list = [None] * len(runs)
+    above = enc_0
+    for k in range(len(runs) - 1, -1, -1):
+        above_list[k] = above
+        above = backend.mulmod(above, runs[k][2], pk.n_2)
+
+    r_neg = [r_neg_i for run in runs for r_neg_i in run[0]]
+    run_sums = [sum_i for run in runs for sum_i in run[1]]
+
+    order = list(range(len(c_encrypt)))
+    secrets.SystemRandom().shuffle(order)  # Random order of the e values
+
+    job_id = secrets.randbits(62) + 1  # Id of this comparison. 0 means cancelled
+    job.value = job_id
+
+    futures = []
+    for k in range(0, len(order), E_CHUNK):
+        chunk = [(c_encrypt[i], r_neg[i], run_sums[i], above_list[i // run_len]) for i in order[k:k + E_CHUNK]]
+        futures.append(executor.submit(e_chunk_worker, job_id, enc_1, chunk))
+
+    comp_result = 0
+    for fut in as_completed(futures):
+        found, checked = fut.result()
+        sqp_stats.e_computed += checked
+        sqp_stats.e_decrypted += checked
+
+        if found:  # r larger than c - Cancel the rest of the work
+            job.value = 0
+            for fut_i in futures:
+                fut_i.cancel()
+            comp_result = 1
+            break
+
+    return comp_result
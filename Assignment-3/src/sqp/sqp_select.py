@@ -0,0 +1,186 @@
+import secrets
+
+from src.constants.const import BATCH_WORKERS
+from src.eqt.eqt import eqt
+from src.paillier.paillier import enc, dec, secure_addition, secure_subst, secure_scalar_mult, calc_shared, \
+    calc_material, sqp
+from src.sqp.sqp_batch import sqp_many
+
+
+class SelectStats:
+    """
+    Counters of a secure selection
+    """
+    __slots__ = ("rounds", "comparisons", "selections")
+
+    def __init__(self):
+        self.rounds = 0  # Rounds of independent comparisons
+        self.comparisons = 0  # Comparisons performed
+        self.selections = 0  # Homomorphic selections performed
+
+    def toString(self):
+        print("Rounds: {}\nComparisons: {}\nSelections: {}".format(self.rounds, self.comparisons, self.selections))
+
+
+def secure_select(num1, num2, beta, pk, sk):
+    """
+    Selects [num1] if beta is 1, otherwise [num2]: [b] + [beta * (a - b)].
+    The key holder, who knows beta from the comparison, only sees a - b blinded by a random value modulus n,
+    and the result is a fresh ciphertext which can not be linked to the inputs
+    :param num1: First encrypted number
+    :param num2: Second encrypted number
+    :param beta: Result of the comparison, 0 or 1
+    :param pk: Public Key
+    :param sk: Secret Key
+    :return: The encrypted number selected
+    """
+    # Evaluator: [x] = [a] - [b] + rho
+    rho = secrets.randbelow(pk.n)
+    x_enc = secure_addition(secure_subst(num1, num2, pk), enc(rho, pk), pk)
+
+    # Key holder: [beta] and [beta * x]
+    beta_enc = enc(beta, pk)
+    beta_x = enc(beta * dec(x_enc, sk, pk), pk)
+
+    # Evaluator: [beta * (a - b)] = [beta * x] - rho * [beta]
+    beta_diff = secure_subst(beta_x, secure_scalar_mult(beta_enc, rho, pk), pk)
+
+    return secure_addition(num2, beta_diff, pk)
+
+
+def compare_round(pairs, pk, sk, msg_len, workers=BATCH_WORKERS):
+    """
+    Performs all the independent comparisons of a round
+    :param pairs: List with the pairs of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param workers: Amount of worker processes. 1 runs them in this process
+    :return: A list with 1 if the first number is larger or equal, otherwise 0, for every pair
+    """
+    if workers == 1:  # Without the pool of processes. Only the public constants are shared
+        shared = calc_shared(pk, msg_len)
+        return [sqp(num1, num2, pk, sk, msg_len, calc_material(pk, msg_len, shared)) for num1, num2 in pairs]
+
+    results = [None] * len(pairs)
+    for idx, result in sqp_many(pairs, pk, sk, msg_len, workers):
+        results[idx] = result
+
+    return results
+
+
+def tournament(values, indices, pk, sk, msg_len, maximum=True, workers=BATCH_WORKERS, stats=None):
+    """
+    Finds the maximum or the minimum of encrypted numbers with a tournament tree.
+    All the comparisons of a round are independent, so there are log2(n) rounds and n - 1 comparisons.
+    The winner of each match and its index are carried forward with homomorphic selections
+    :param values: List of encrypted numbers
+    :param indices: List with the encrypted index of every number
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param maximum: True for the maximum, False for the minimum
+    :param workers: Amount of worker processes. 1 runs the comparisons in this process
+    :param stats: SelectStats updated with the work done. It is created if it is not set
+    :return: The encrypted winner, its encrypted index and the stats
+    """
+    if not values:
+        raise ValueError("No values to select from")
+
+    stats = SelectStats() if stats is None else stats
+    players = list(zip(values, indices))
+
+    while len(players) > 1:
+        pairs = [(players[i][0], players[i + 1][0]) for i in range(0, len(players) - 1, 2)]
+        results = compare_round(pairs, pk, sk, msg_len, workers)
+
+        stats.rounds += 1
+        stats.comparisons += len(pairs)
+
+        winners = []
+        for match, result in enumerate(results):
+            (val_1, idx_1), (val_2, idx_2) = players[2 * match], players[2 * match + 1]
+            beta = result if maximum else 1 - result  # 1 if the first player wins
+
+            winners.append((secure_select(val_1, val_2, beta, pk, sk), secure_select(idx_1, idx_2, beta, pk, sk)))
+            stats.selections += 2
+
+        if len(players) % 2 == 1:  # The last player goes directly to the next round
+            winners.append(players[-1])
+
+        players = winners
+
+    return players[0][0], players[0][1], stats
+
+
+def argmax(values, pk, sk, msg_len, workers=BATCH_WORKERS):
+    """
+    Finds the maximum of encrypted numbers and its index
+    :param values: List of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param workers: Amount of worker processes. 1 runs the comparisons in this process
+    :return: The encrypted maximum, its encrypted index and the stats
+    """
+    return tournament(values, [enc(i, pk) for i in range(len(values))], pk, sk, msg_len, True, workers)
+
+
+def argmin(values, pk, sk, msg_len, workers=BATCH_WORKERS):
+    """
+    Finds the minimum of encrypted numbers and its index
+    :param values: List of encrypted numbers
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param workers: Amount of worker processes. 1 runs the comparisons in this process
+    :return: The encrypted minimum, its encrypted index and the stats
+    """
+    return tournament(values, [enc(i, pk) for i in range(len(values))], pk, sk, msg_len, False, workers)
+
+
+def top_k(values, k, pk, sk, msg_len, maximum=True, workers=BATCH_WORKERS):
+    """
+    Finds the k largest or smallest encrypted numbers and their indexes with k tournaments.
+    After each tournament the winner is replaced: every index is compared with the encrypted
+    index of the winner with the equality test, and the matching one is selected out.
+    The values are shifted one bit so the replacement loses against any other value
+    :param values: List of encrypted numbers
+    :param k: Amount of numbers to find
+    :param pk: Public Key
+    :param sk: Secret Key
+    :param msg_len: Length of the original messages
+    :param maximum: True for the largest numbers, False for the smallest
+    :param workers: Amount of worker processes. 1 runs the comparisons in this process
+    :return: A list with k pairs of encrypted number and encrypted index, from the best, and the stats
+    """
+    if not 0 < k <= len(values):
+        raise ValueError("k has to be between 1 and the amount of values")
+
+    stats = SelectStats()
+    indices = [enc(i, pk) for i in range(len(values))]
+
+    # For the maximum 0 loses against any a + 1, for the minimum 2^(l + 1) - 1 loses against any a
+    if maximum:
+        players = [secure_addition(val, enc(1, pk), pk) for val in values]
+        removed = enc(0, pk)
+        shift = 1
+    else:
+        players = list(values)
+        removed = enc(2 ** (msg_len + 1) - 1, pk)
+        shift = 0
+
+    winners = []
+    for _ in range(k):
+        win_val, win_idx, stats = tournament(players, indices, pk, sk, msg_len + 1, maximum, workers, stats)
+        winners.append((secure_subst(win_val, enc(shift, pk), pk), win_idx))
+
+        if len(winners) == k:  # Last one, nothing to remove
+            break
+
+        # Replace the winner. As the comparison bits, the equality bits are only seen by the key holder
+        for i, idx in enumerate(indices):
+            players[i] = secure_select(removed, players[i], eqt(idx, win_idx, pk, sk), pk, sk)
+            stats.selections += 1
+
+    return winners, stats
@@ -0,0 +1,36 @@
+class SqpStats:
+    """
+    Counters of the Secure Comparison Protocol runs of this process
+    """
+    __slots__ = ("comparisons", "e_computed", "e_decrypted")
+
+    def __init__(self):
+        self.comparisons = 0  # Comparisons performed
+        self.e_computed = 0  # e_i values calculated
+        self.e_decrypted = 0  # e_i values decrypted
+
+    def reset(self):
+        """
+        Sets all the counters to zero
+        :return:
+        """
+        self.comparisons = 0
+        self.e_computed = 0
+        self.e_decrypted = 0
+
+    def avg_e_computed(self):
+        """
+        Average amount of e_i values calculated per comparison
+        :return: The average, 0 if no comparison was performed
+        """
+        return self.e_computed / self.comparisons if self.comparisons > 0 else 0
+
+    def avg_e_decrypted(self):
+        """
+        Average amount of e_i values decrypted per comparison
+        :return: The average, 0 if no comparison was performed
+        """
+        return self.e_decrypted / self.comparisons if self.comparisons > 0 else 0
+
+
+sqp_stats = SqpStats()  # Counters of this process